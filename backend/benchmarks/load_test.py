@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Async load test for the KOG backend.
+
+Starts server:app under uvicorn in a subprocess (against a local mongod, or an
+in-memory mongomock-motor stand-in) and drives it with a weighted mix of requests
+from concurrent httpx clients. Reports throughput and p50/p95/p99 latency per
+operation and can save the results as JSON for comparison between commits.
+
+Examples:
+    python backend/benchmarks/load_test.py --mongo mock --duration 15
+    python backend/benchmarks/load_test.py --mongo local --concurrency 64 \\
+        --mix content=90,status_get=5,status_post=5 --output bench.json
+    python backend/benchmarks/load_test.py --url http://localhost:8001 --compare bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_MIX = "content=80,status_get=10,status_post=8,content_put=2"
+OPERATIONS = ("content", "status_get", "status_post", "content_put")
+
+
+# ===== Server process =====
+def serve(mongo: str, port: int) -> None:
+    sys.path.insert(0, str(BACKEND_DIR))
+    import uvicorn
+    import server
+
+    if mongo == "mock":
+        from mongomock_motor import AsyncMongoMockClient
+
+        server.create_mongo_client = AsyncMongoMockClient
+    uvicorn.run(server.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mongo: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    # Every request comes from one client IP; measure capacity, not the per-client budgets
+    env.setdefault("RATE_LIMITS", "")
+    if mongo == "mock":
+        # mongomock has no change streams; poll instead of retrying the watch
+        env.setdefault("CONTENT_SYNC_MODE", "poll")
+    return subprocess.Popen(
+        [sys.executable, __file__, "--serve", "--mongo", mongo, "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+async def wait_ready(http, base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await http.get(f"{base_url}/api/")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} not ready after {timeout}s")
+
+
+# ===== Load generation =====
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise SystemExit(f"unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+async def run_load(base_url: str, concurrency: int, duration: float, warmup: float, weights: dict) -> dict:
+    import httpx
+
+    api = f"{base_url}/api"
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=30.0, limits=limits) as http:
+        await wait_ready(http, base_url)
+        content = (await http.get(f"{api}/content")).json()
+
+        async def call(op: str):
+            if op == "content":
+                return await http.get(f"{api}/content")
+            if op == "status_get":
+                return await http.get(f"{api}/status", params={"limit": 100})
+            if op == "status_post":
+                return await http.post(f"{api}/status", json={"client_name": f"bench-{random.randrange(64)}"})
+            return await http.put(f"{api}/content", json=content)
+
+        names = list(weights)
+        op_weights = list(weights.values())
+        latencies = {name: [] for name in names}
+        errors = {name: 0 for name in names}
+        start = time.perf_counter()
+        measure_from = start + warmup
+        stop_at = measure_from + duration
+
+        async def worker():
+            while True:
+                op = random.choices(names, op_weights)[0]
+                began = time.perf_counter()
+                if began >= stop_at:
+                    return
+                try:
+                    ok = (await call(op)).status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                if began >= measure_from:
+                    latencies[op].append(time.perf_counter() - began)
+                    if not ok:
+                        errors[op] += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return summarize(latencies, errors, duration)
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def stats(values: list, errors: int, duration: float) -> dict:
+    values = sorted(values)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "rps": round(len(values) / duration, 1),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+    }
+
+
+def summarize(latencies: dict, errors: dict, duration: float) -> dict:
+    result = {op: stats(values, errors[op], duration) for op, values in latencies.items()}
+    result["total"] = stats([v for values in latencies.values() for v in values], sum(errors.values()), duration)
+    return result
+
+
+# ===== Reporting =====
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(results: dict, baseline: dict = None) -> None:
+    print(f"{'operation':<12} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for op, row in results.items():
+        line = (f"{op:<12} {row['requests']:>9} {row['errors']:>7} {row['rps']:>9} "
+                f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9}")
+        base = (baseline or {}).get(op)
+        if base:
+            deltas = []
+            for key in ("rps", "p50_ms", "p99_ms"):
+                if base[key]:
+                    deltas.append(f"{key} {100 * (row[key] - base[key]) / base[key]:+.1f}%")
+            line += "   vs baseline: " + ", ".join(deltas)
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo", choices=("mock", "local"), default="mock",
+                        help="mock: in-memory mongomock-motor; local: MONGO_URL from backend/.env")
+    parser.add_argument("--url", help="benchmark an already running server instead of starting one")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted operations (default {DEFAULT_MIX})")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="print deltas against a previous JSON result")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.mongo, args.port)
+        return 0
+
+    weights = parse_mix(args.mix)
+    process = None
+    base_url = args.url
+    if base_url is None:
+        port = free_port()
+        process = start_server(args.mongo, port)
+        base_url = f"http://127.0.0.1:{port}"
+    try:
+        results = asyncio.run(run_load(base_url.rstrip("/"), args.concurrency, args.duration, args.warmup, weights))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    baseline = json.loads(Path(args.compare).read_text())["results"] if args.compare else None
+    print_report(results, baseline)
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "config": {
+                "mongo": "external" if args.url else args.mongo,
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "warmup": args.warmup,
+                "mix": weights,
+            },
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Saved results to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the KOG backend.
+
+Measures two things, each in fresh interpreter processes:
+  import time        - `python -X importtime -c "import server"`, summarized as
+                       the total and the slowest top-level packages
+  time to first 200  - from spawning uvicorn (via load_test.py --serve) until
+                       GET /api/content first answers 200, i.e. imports plus
+                       lifespan startup (pool warmup, indexes, content load)
+
+With --budget-ms the script exits non-zero when the median time to first 200
+exceeds the budget, so it can guard cold start in CI.
+
+Examples:
+    python backend/benchmarks/startup.py --mongo mock --runs 5
+    python backend/benchmarks/startup.py --mongo local --budget-ms 1500 --output startup.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from load_test import BACKEND_DIR, free_port, start_server
+
+
+# ===== Import time =====
+def import_times() -> list:
+    """Return (module, self_us, cumulative_us, depth) rows for `import server`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def summarize_imports(rows: list, top: int) -> dict:
+    packages = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    total_us = sum(self_us for _, self_us, _, _ in rows)
+    server_us = next((cumulative for name, _, cumulative, _ in rows if name == "server"), total_us)
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "server_ms": round(server_us / 1000, 1),
+        "modules": len(rows),
+        "packages": [{"package": name, "ms": round(us / 1000, 1)} for name, us in slowest],
+    }
+
+
+# ===== Time to first 200 =====
+def time_to_first_200(mongo: str, timeout: float) -> float:
+    import httpx
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/content"
+    started = time.perf_counter()
+    process = start_server(mongo, port)
+    try:
+        with httpx.Client(timeout=1.0) as http:
+            while time.perf_counter() - started < timeout:
+                if process.poll() is not None:
+                    raise RuntimeError(f"server exited with code {process.returncode}")
+                try:
+                    if http.get(url).status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.005)
+        raise RuntimeError(f"no 200 from {url} within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+# ===== Reporting =====
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo", choices=("mock", "local"), default="mock",
+                        help="mongomock-motor in-process, or MONGO_URL from backend/.env")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="number of packages in the import breakdown")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--budget-ms", type=float, help="fail when the median time to first 200 exceeds this")
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    imports = [summarize_imports(import_times(), args.top) for _ in range(args.runs)]
+    first_200 = sorted(time_to_first_200(args.mongo, args.timeout) * 1000 for _ in range(args.runs))
+    best_import = min(imports, key=lambda run: run["total_ms"])
+    results = {
+        "mongo": args.mongo,
+        "runs": args.runs,
+        "import_ms": {
+            "median": round(statistics.median(run["total_ms"] for run in imports), 1),
+            "server_median": round(statistics.median(run["server_ms"] for run in imports), 1),
+            "fastest_run_packages": best_import["packages"],
+        },
+        "first_200_ms": {
+            "median": round(statistics.median(first_200), 1),
+            "min": round(first_200[0], 1),
+            "max": round(first_200[-1], 1),
+        },
+        "budget_ms": args.budget_ms,
+    }
+
+    print(f"import server: median {results['import_ms']['server_median']} ms "
+          f"({best_import['modules']} modules; {results['import_ms']['median']} ms incl. interpreter imports)")
+    print(f"{'package':<24} {'self ms':>8}   (fastest run)")
+    for row in best_import["packages"]:
+        print(f"{row['package']:<24} {row['ms']:>8}")
+    first = results["first_200_ms"]
+    print(f"time to first 200: median {first['median']} ms (min {first['min']}, max {first['max']}) over {args.runs} runs")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.budget_ms is not None and first["median"] > args.budget_ms:
+        print(f"FAIL: median time to first 200 {first['median']} ms exceeds budget {args.budget_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for serializing GET /api/status responses.
+
+Compares, per item, the CPU time and peak allocations of:
+  baseline      - dict comprehension + StatusCheck(**doc), then FastAPI's
+                  response_model validation and JSONResponse rendering
+  type_adapter  - one cached TypeAdapter(List[StatusCheck]) validating the raw
+                  documents and dumping JSON in pydantic-core
+  orjson_raw    - the trusted Mongo documents rendered by ORJSONResponse
+                  (what the endpoint does now)
+
+Example:
+    python backend/benchmarks/status_models.py --rows 1000 10000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from server import StatusCheck  # noqa: E402
+
+RESPONSE_FIELD = create_response_field(name="Response_get_status_checks", type_=List[StatusCheck])
+STATUS_CHECKS_ADAPTER = TypeAdapter(List[StatusCheck])
+
+
+def make_docs(rows: int, with_id: bool) -> list:
+    start = datetime(2026, 1, 1)
+    docs = []
+    for i in range(rows):
+        doc = {"id": str(uuid.uuid4()), "client_name": f"client-{i % 50}",
+               "timestamp": start + timedelta(milliseconds=i)}
+        if with_id:
+            doc["_id"] = uuid.uuid4().bytes[:12]
+        docs.append(doc)
+    return docs
+
+
+def baseline(docs: list) -> bytes:
+    models = [StatusCheck(**{k: v for k, v in doc.items() if k != "_id"}) for doc in docs]
+    content = asyncio.run(serialize_response(field=RESPONSE_FIELD, response_content=models))
+    return JSONResponse(content).body
+
+
+def type_adapter(docs: list) -> bytes:
+    return STATUS_CHECKS_ADAPTER.dump_json(STATUS_CHECKS_ADAPTER.validate_python(docs))
+
+
+def orjson_raw(docs: list) -> bytes:
+    return ORJSONResponse(docs).body
+
+
+VARIANTS = {"baseline": (baseline, True), "type_adapter": (type_adapter, False), "orjson_raw": (orjson_raw, False)}
+
+
+def measure(fn, docs: list, repeat: int) -> dict:
+    fn(docs)  # warm caches
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(docs)
+    elapsed = (time.perf_counter() - started) / repeat
+    tracemalloc.start()
+    fn(docs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"us_per_item": elapsed * 1e6 / len(docs), "peak_bytes_per_item": peak / len(docs)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rows':>6} {'variant':<13} {'us/item':>9} {'bytes/item':>11} {'speedup':>8}")
+    for rows in args.rows:
+        base_time = None
+        for name, (fn, with_id) in VARIANTS.items():
+            result = measure(fn, make_docs(rows, with_id), args.repeat)
+            base_time = base_time or result["us_per_item"]
+            print(f"{rows:>6} {name:<13} {result['us_per_item']:>9.2f} {result['peak_bytes_per_item']:>11.0f} "
+                  f"{base_time / result['us_per_item']:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
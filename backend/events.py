@@ -0,0 +1,100 @@
+import asyncio
+import random
+from typing import AsyncIterator, Callable, Optional, Set
+
+HEARTBEAT = b": ping\n\n"
+
+
+def format_event(event: str, data: str, event_id: Optional[str] = None) -> bytes:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class Subscription:
+    __slots__ = ("queue", "evicted")
+
+    def __init__(self, max_queue: int):
+        self.queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(max_queue)
+        self.evicted = False
+
+
+class Broadcaster:
+    """In-process fan-out of pre-encoded Server-Sent Events.
+
+    An idle subscriber costs one small queue and a parked coroutine. publish()
+    never awaits: a subscriber whose queue is full is evicted and its stream
+    ends, and the client's EventSource reconnects and catches up from its
+    Last-Event-ID. Streams also end after max_lifetime seconds, so open tabs
+    never keep a worker from shutting down for longer than that.
+    """
+
+    def __init__(self, max_queue: int = 8, max_subscribers: int = 10000):
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self.subscribers: Set[Subscription] = set()
+        self.evictions = 0
+
+    def full(self) -> bool:
+        return len(self.subscribers) >= self.max_subscribers
+
+    def subscribe(self) -> Optional[Subscription]:
+        if self.full():
+            return None
+        subscription = Subscription(self.max_queue)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
+
+    def publish(self, message: bytes) -> None:
+        for subscription in list(self.subscribers):
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._evict(subscription)
+
+    def _evict(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
+        subscription.evicted = True
+        self.evictions += 1
+        # Drop the backlog so the end-of-stream marker fits
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+    async def stream(self, heartbeat: float, max_lifetime: float, opening: Callable[[], bytes] = lambda: b"",
+                     retry_ms: int = 3000) -> AsyncIterator[bytes]:
+        """Yield the events for one client, with a comment line every `heartbeat` seconds of silence.
+
+        The subscription is taken on first iteration, so a client that leaves before
+        the response starts never registers. `opening()` is called right after
+        subscribing; nothing published after that point can be missed.
+        """
+        subscription = self.subscribe()
+        if subscription is None:
+            return
+        loop = asyncio.get_running_loop()
+        # Spread the reconnects of clients that connected together
+        deadline = loop.time() + max_lifetime * random.uniform(0.9, 1.0)
+        try:
+            yield f"retry: {retry_ms}\n\n".encode() + opening()
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+                try:
+                    message = await asyncio.wait_for(subscription.queue.get(), min(heartbeat, remaining))
+                except asyncio.TimeoutError:
+                    if loop.time() < deadline:
+                        yield HEARTBEAT
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(subscription)
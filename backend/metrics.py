@@ -0,0 +1,221 @@
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Minimal in-process metrics store rendered in Prometheus text format.
+
+    Everything runs on the event loop thread, so plain dicts and ints suffice and
+    recording a sample costs a dict lookup plus a bisect.
+    """
+
+    def __init__(self):
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        self.help[name] = help_text
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        series = self.histograms.setdefault(name, {})
+        histogram = series.get(labels)
+        if histogram is None:
+            histogram = series[labels] = Histogram()
+        histogram.observe(value)
+
+    def inc(self, name: str, labels: Labels, value: float = 1) -> None:
+        series = self.counters.setdefault(name, {})
+        series[labels] = series.get(labels, 0) + value
+
+    def render(self) -> str:
+        lines = []
+        for name, series in self.histograms.items():
+            lines += self._header(name, "histogram")
+            for labels, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        for name, series in self.counters.items():
+            lines += self._header(name, "counter")
+            for labels, value in series.items():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, name: str, kind: str) -> Iterable[str]:
+        if name in self.help:
+            yield f"# HELP {name} {self.help[name]}"
+        yield f"# TYPE {name} {kind}"
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ===== HTTP middleware =====
+class MetricsMiddleware:
+    """Pure ASGI middleware timing each request by method and route template.
+
+    The route template is read from scope["route"] after routing, so path
+    parameters do not create new series; unmatched paths share one label.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+        registry.describe("http_request_duration_seconds", "Time spent handling HTTP requests.")
+        registry.describe("http_responses_total", "HTTP responses by status code.")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            labels = (("method", scope["method"]), ("route", getattr(route, "path", "unmatched")))
+            self.registry.observe("http_request_duration_seconds", labels, time.perf_counter() - started)
+            self.registry.inc("http_responses_total", labels + (("status", str(status)),))
+
+
+# ===== Mongo instrumentation =====
+def _count_one(result) -> int:
+    return 0 if result is None else 1
+
+# Operations timed on each collection, with how many documents each result represents
+TIMED_OPERATIONS = {
+    "find_one": _count_one,
+    "find_one_and_update": _count_one,
+    "insert_one": lambda result: 1,
+    "insert_many": lambda result: len(result.inserted_ids),
+    "update_one": lambda result: result.modified_count,
+    "update_many": lambda result: result.modified_count,
+    "delete_many": lambda result: result.deleted_count,
+    "count_documents": lambda result: 0,
+    "create_index": lambda result: 0,
+}
+
+
+class InstrumentedDatabase:
+    """Wraps a Motor database so collection calls record timing and document counts."""
+
+    def __init__(self, database, registry: MetricsRegistry):
+        self._database = database
+        self._registry = registry
+        self._collections: Dict[str, "InstrumentedCollection"] = {}
+        registry.describe("mongo_operation_duration_seconds", "Time spent in Motor calls.")
+        registry.describe("mongo_documents_total", "Documents returned or written by Motor calls.")
+
+    def __getitem__(self, name: str) -> "InstrumentedCollection":
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = InstrumentedCollection(self._database[name], self._registry)
+        return collection
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._database, name)
+        if not name.startswith("_") and hasattr(attr, "insert_one"):
+            return self[name]
+        return attr
+
+
+class InstrumentedCollection:
+    def __init__(self, collection, registry: MetricsRegistry):
+        self._collection = collection
+        self._registry = registry
+        self._name = collection.name
+
+    def _record(self, operation: str, started: float, documents: int) -> None:
+        labels = (("collection", self._name), ("operation", operation))
+        self._registry.observe("mongo_operation_duration_seconds", labels, time.perf_counter() - started)
+        if documents:
+            self._registry.inc("mongo_documents_total", labels, documents)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._collection, name)
+        count = TIMED_OPERATIONS.get(name)
+        if count is None:
+            return attr
+
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            result = await attr(*args, **kwargs)
+            self._record(name, started, count(result))
+            return result
+        return timed
+
+    def find(self, *args, **kwargs) -> "InstrumentedCursor":
+        return InstrumentedCursor(self._collection.find(*args, **kwargs), self, "find")
+
+    def aggregate(self, *args, **kwargs) -> "InstrumentedCursor":
+        return InstrumentedCursor(self._collection.aggregate(*args, **kwargs), self, "aggregate")
+
+
+class InstrumentedCursor:
+    """Times to_list(); chained builder calls (sort, limit, ...) keep the wrapper."""
+
+    def __init__(self, cursor, collection: InstrumentedCollection, operation: str):
+        self._cursor = cursor
+        self._collection = collection
+        self._operation = operation
+
+    async def to_list(self, length):
+        started = time.perf_counter()
+        documents = await self._cursor.to_list(length)
+        self._collection._record(self._operation, started, len(documents))
+        return documents
+
+    def __aiter__(self):
+        # Streaming iteration is paced by the consumer, so it is not timed
+        return self._cursor.__aiter__()
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._cursor, name)
+        if not callable(attr):
+            return attr
+
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return self if result is self._cursor else result
+        return chained
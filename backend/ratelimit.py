@@ -0,0 +1,172 @@
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+READ_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+
+def parse_rate_limits(spec: str) -> List[Tuple[str, str, float, float]]:
+    """Parse "POST /api/status=20:40,PUT /api/content=1:5" into
+    (method, path, tokens per second, burst) rules. A path ending in "*" is a prefix."""
+    rules = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        route, _, budget = part.rpartition("=")
+        method, _, path = route.strip().partition(" ")
+        rate, _, burst = budget.partition(":")
+        rules.append((method.upper(), path.strip(), float(rate), float(burst or rate)))
+    return rules
+
+
+class TokenBucketLimiter:
+    """Per-(rule, client) token buckets, bounded to max_buckets.
+
+    When the table is full, refilled buckets are swept first and then the least
+    recently used ones, down to 90% of the limit, so each sweep pays for itself.
+    """
+
+    def __init__(self, rules: List[Tuple[str, str, float, float]], max_buckets: int = 100000):
+        self.rules = rules
+        self.max_buckets = max_buckets
+        self.buckets: "OrderedDict[Tuple[int, str], List[float]]" = OrderedDict()
+
+    def match(self, method: str, path: str) -> Optional[int]:
+        for index, (rule_method, rule_path, _, _) in enumerate(self.rules):
+            if rule_method != method:
+                continue
+            if path == rule_path or (rule_path.endswith("*") and path.startswith(rule_path[:-1])):
+                return index
+        return None
+
+    def take(self, rule: int, client: str) -> float:
+        """Consume one token; return 0 on success or the seconds until one is available."""
+        _, _, rate, burst = self.rules[rule]
+        now = time.monotonic()
+        bucket = self.buckets.get((rule, client))
+        if bucket is None:
+            if len(self.buckets) >= self.max_buckets:
+                self._sweep(now)
+            bucket = self.buckets[(rule, client)] = [burst, now]
+        else:
+            self.buckets.move_to_end((rule, client))
+        tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / rate
+
+    def _sweep(self, now: float) -> None:
+        # A bucket that has refilled to its burst is indistinguishable from a new one
+        for key, (tokens, last) in list(self.buckets.items()):
+            _, _, rate, burst = self.rules[key[0]]
+            if tokens + (now - last) * rate >= burst:
+                del self.buckets[key]
+        # Still full (e.g. many clients all mid-burst): forget the least recently used
+        target = int(self.max_buckets * 0.9)
+        while len(self.buckets) > target:
+            self.buckets.popitem(last=False)
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests; callers wait at most max_wait seconds for a slot."""
+
+    def __init__(self, limit: int, max_wait: float):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.max_wait = max_wait
+        self.waiting = 0
+
+    async def acquire(self) -> bool:
+        if not self.semaphore.locked():
+            await self.semaphore.acquire()
+            return True
+        if self.max_wait <= 0:
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), self.max_wait)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+
+    def release(self) -> None:
+        self.semaphore.release()
+
+
+class LoadSheddingMiddleware:
+    """Pure ASGI middleware applying per-route token buckets and read/write concurrency limits.
+
+    Reads and writes get separate pools so ingest bursts cannot take capacity from
+    the public read endpoints, and writes are shed outright while reads are queueing.
+    Rejections are 429 (rate limit) or 503 (overload), both with Retry-After.
+
+    Clients are keyed by socket address, or with trusted_proxies=N by the Nth
+    X-Forwarded-For entry from the right: the address the outermost trusted proxy
+    saw. Entries further left are supplied by the client and cannot be trusted.
+    """
+
+    def __init__(self, app, rate_limiter: TokenBucketLimiter, read_limiter: ConcurrencyLimiter,
+                 write_limiter: ConcurrencyLimiter, exempt_paths: Tuple[str, ...] = (),
+                 trusted_proxies: int = 0, shed_retry_after: int = 1):
+        self.app = app
+        self.rate_limiter = rate_limiter
+        self.read_limiter = read_limiter
+        self.write_limiter = write_limiter
+        self.exempt_paths = exempt_paths
+        self.trusted_proxies = trusted_proxies
+        self.shed_retry_after = shed_retry_after
+
+    def client_key(self, scope) -> str:
+        if self.trusted_proxies:
+            hops = []
+            for name, value in scope.get("headers", ()):
+                if name == b"x-forwarded-for":
+                    hops += [hop.strip() for hop in value.decode("latin-1").split(",")]
+            if len(hops) >= self.trusted_proxies:
+                return hops[-self.trusted_proxies]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        rule = self.rate_limiter.match(method, scope["path"])
+        if rule is not None:
+            wait = self.rate_limiter.take(rule, self.client_key(scope))
+            if wait:
+                await self.reject(send, 429, "Rate limit exceeded", math.ceil(wait))
+                return
+
+        is_read = method in READ_METHODS
+        limiter = self.read_limiter if is_read else self.write_limiter
+        if not is_read and self.read_limiter.waiting:
+            await self.reject(send, 503, "Server busy", self.shed_retry_after)
+            return
+        if not await limiter.acquire():
+            await self.reject(send, 503, "Server busy", self.shed_retry_after)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    @staticmethod
+    async def reject(send, status: int, detail: str, retry_after: int) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, retry_after)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
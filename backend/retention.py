@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+TTL_INDEX_NAME = "timestamp_ttl"
+INDEX_OPTIONS_CONFLICT = (85, 86)  # IndexOptionsConflict, IndexKeySpecsConflict
+HOURLY = "status_rollups_hourly"
+DAILY = "status_rollups_daily"
+
+
+def _truncate_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _truncate_day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _rollup_pipeline(match: dict, date_field: str, unit: str, count: object,
+                     first_seen: str, last_seen: str, into: str) -> list:
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": {"client_name": "$client_name", "bucket": {"$dateTrunc": {"date": date_field, "unit": unit}}},
+            "count": {"$sum": count},
+            "first_seen": {"$min": first_seen},
+            "last_seen": {"$max": last_seen},
+        }},
+        {"$set": {"client_name": "$_id.client_name", "bucket": "$_id.bucket"}},
+        # Each bucket is always recomputed from complete input, so replacing is idempotent
+        {"$merge": {"into": into, "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}},
+    ]
+
+
+class StatusRetention:
+    """TTL expiry of raw status checks plus hourly/daily per-client rollups.
+
+    Raw rows expire retention_days after their timestamp via a TTL index. Before
+    that happens, a background job folds them into status_rollups_hourly and
+    status_rollups_daily. The job trails the TTL by lead_hours and keeps a
+    watermark, so every hour is summarised once while its rows still exist.
+    The TTL index is only created (or lowered) after a complete rollup pass, so
+    enabling retention on an existing collection backfills before anything expires.
+    """
+
+    def __init__(self, db, retention_days: float, lead_hours: float = 24, interval: float = 3600):
+        self.db = db
+        self.retention = timedelta(days=retention_days)
+        # At least an hour, so a finished pass always reaches past the (hour-truncated) expiry horizon
+        self.lead = max(timedelta(hours=lead_hours), timedelta(hours=1))
+        self.interval = interval
+
+    async def ensure_indexes(self) -> None:
+        for name in (HOURLY, DAILY):
+            await self.db[name].create_index([("bucket", 1)], name="bucket")
+            await self.db[name].create_index([("client_name", 1), ("bucket", 1)], name="client_name_bucket")
+
+    async def ensure_ttl_index(self) -> None:
+        seconds = int(self.retention.total_seconds())
+        try:
+            await self.db.status_checks.create_index(
+                [("timestamp", 1)], name=TTL_INDEX_NAME, expireAfterSeconds=seconds
+            )
+        except OperationFailure as e:
+            if e.code not in INDEX_OPTIONS_CONFLICT:
+                raise
+            await self.db.command("collMod", "status_checks", index={"name": TTL_INDEX_NAME, "expireAfterSeconds": seconds})
+
+    async def _watermark(self) -> Optional[datetime]:
+        state = await self.db.status_rollup_state.find_one({"_id": "status_checks"})
+        if state is not None:
+            return state["rolled_up_to"]
+        oldest = await self.db.status_checks.find({}, {"timestamp": 1}).sort("timestamp", 1).limit(1).to_list(1)
+        return _truncate_hour(oldest[0]["timestamp"]) if oldest else None
+
+    async def run_once(self) -> int:
+        """Roll up every complete hour older than the TTL horizon plus lead; return hours processed."""
+        if not self.retention:
+            return 0
+        now = datetime.utcnow()
+        # Never roll up the open hour, even if the lead exceeds the retention window
+        cutoff = _truncate_hour(min(now - self.retention + self.lead, now))
+        start = await self._watermark()
+        processed = 0
+        while start is not None and start < cutoff:
+            end = min(start + timedelta(days=1), cutoff)
+            await self.db.status_checks.aggregate(_rollup_pipeline(
+                {"timestamp": {"$gte": start, "$lt": end}},
+                "$timestamp", "hour", 1, "$timestamp", "$timestamp", HOURLY,
+            )).to_list(None)
+            day_start = _truncate_day(start)
+            day_end = _truncate_day(end - timedelta(microseconds=1)) + timedelta(days=1)
+            await self.db[HOURLY].aggregate(_rollup_pipeline(
+                {"bucket": {"$gte": day_start, "$lt": day_end}},
+                "$bucket", "day", "$count", "$first_seen", "$last_seen", DAILY,
+            )).to_list(None)
+            await self.db.status_rollup_state.update_one(
+                {"_id": "status_checks"}, {"$set": {"rolled_up_to": end}}, upsert=True
+            )
+            processed += int((end - start).total_seconds() // 3600)
+            start = end
+        return processed
+
+    async def run_forever(self) -> None:
+        ttl_ready = False
+        while True:
+            try:
+                hours = await self.run_once()
+                if hours:
+                    logger.info("Status retention: rolled up %d hours", hours)
+                if not ttl_ready:
+                    # Everything up to the expiry horizon is summarised; rows may now be deleted
+                    await self.ensure_ttl_index()
+                    ttl_ready = True
+            except Exception:
+                logger.exception("Status retention: rollup failed")
+            await asyncio.sleep(self.interval)
+
+
+
+async def drop_ttl_index(db) -> None:
+    """Retention is off: make sure a TTL index left from an earlier run stops deleting rows."""
+    try:
+        await db.status_checks.drop_index(TTL_INDEX_NAME)
+    except OperationFailure:
+        pass
@@ -1,26 +1,101 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import PlainTextResponse, StreamingResponse
+from fastapi.responses import ORJSONResponse
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import json
+import base64
+import asyncio
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Literal, Optional, Tuple
 import uuid
-from datetime import datetime
+import time
+import gzip
+import zlib
+import copy
+import hashlib
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from metrics import InstrumentedDatabase, MetricsMiddleware, MetricsRegistry
+from ratelimit import ConcurrencyLimiter, LoadSheddingMiddleware, TokenBucketLimiter, parse_rate_limits
+from events import Broadcaster, format_event
+
+# Optional subsystems are imported where they are switched on, keeping them off the cold-start path
+if TYPE_CHECKING:
+    from status_writer import StatusWriteBuffer
+    from retention import StatusRetention
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection. The client is created in the lifespan handler, not at
+# import, so pool sizing, timeouts and compression come from .env and the pool
+# is warmed before the app starts accepting requests.
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '10'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', '0')) or None
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '0')) or None
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', '')  # e.g. "zstd,snappy,zlib"
+
+client: Optional[AsyncIOMotorClient] = None
+db: Optional[InstrumentedDatabase] = None
+
+# Request and Mongo timings, exposed in Prometheus text format on /metrics
+metrics = MetricsRegistry()
+
+
+def create_mongo_client() -> AsyncIOMotorClient:
+    options: Dict[str, Any] = dict(
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+    )
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    return AsyncIOMotorClient(mongo_url, **options)
+
+
+async def connect_db() -> None:
+    global client, db
+    client = create_mongo_client()
+    db = InstrumentedDatabase(client[os.environ['DB_NAME']], metrics)
+    # Concurrent pings each check out their own connection, so this opens
+    # MONGO_MIN_POOL_SIZE sockets now instead of on the first requests
+    await asyncio.gather(*(db.command("ping") for _ in range(max(1, MONGO_MIN_POOL_SIZE))))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await connect_db()
+    await asyncio.gather(create_indexes(), warm_content())
+    start_content_sync()
+    start_status_writer()
+    start_status_retention()
+    yield
+    await shutdown_db_client()
+
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -35,6 +110,27 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+class StatusBulkError(BaseModel):
+    index: int
+    error: str
+
+class StatusBulkResult(BaseModel):
+    inserted: int
+    errors: List[StatusBulkError]
+
+class StatusBucket(BaseModel):
+    bucket: datetime
+    count: int
+
+class StatusClientStats(BaseModel):
+    client_name: str
+    count: int
+    first_seen: datetime
+    last_seen: datetime
+
+class StatusRollup(StatusClientStats):
+    bucket: datetime
+
 
 # ===== Site Content Models =====
 class CTA(BaseModel):
@@ -116,18 +212,761 @@ DEFAULT_CONTENT: SiteContent = SiteContent(
 )
 
 
-async def get_or_seed_content() -> SiteContent:
+# Seeding happens once per process at startup (and again only if the document
+# disappears), never as part of a normal read.
+content_seed_lock = asyncio.Lock()
+
+# The `epoch` field is a random id fixed when the content document is created. It
+# tells version numbers of a reset or different database apart from ours, which
+# matters for anything outside Mongo that remembers versions (the static snapshot).
+content_epoch = ""
+
+def new_content_epoch() -> str:
+    return uuid.uuid4().hex
+
+async def seed_content() -> None:
+    async with content_seed_lock:
+        try:
+            result = await db.site_content.update_one(
+                {"_id": "kog_site"},
+                {"$setOnInsert": {**DEFAULT_CONTENT.model_dump(), "version": 0, "epoch": new_content_epoch()}},
+                upsert=True,
+            )
+            if result.upserted_id is not None:
+                await record_revision(DEFAULT_CONTENT, 0)
+            else:
+                # Documents created before epochs existed get one once
+                await db.site_content.update_one(
+                    {"_id": "kog_site", "epoch": {"$exists": False}}, {"$set": {"epoch": new_content_epoch()}}
+                )
+        except DuplicateKeyError:
+            pass  # another worker's upsert won the race; the document exists either way
+
+
+async def read_content() -> dict:
     doc = await db.site_content.find_one({"_id": "kog_site"})
     if not doc:
-        await db.site_content.update_one(
-            {"_id": "kog_site"},
-            {"$set": DEFAULT_CONTENT.model_dump()},
-            upsert=True,
-        )
-        return DEFAULT_CONTENT
-    # Remove Mongo _id if present and validate against model
+        await seed_content()
+        doc = await db.site_content.find_one({"_id": "kog_site"})
+    return doc
+
+
+def content_from_doc(doc: dict) -> Tuple[SiteContent, int]:
+    global content_epoch
+    # Remove Mongo _id / version / revision / epoch if present and validate against model
     doc.pop("_id", None)
-    return SiteContent(**doc)
+    doc.pop("revision", None)
+    content_epoch = doc.pop("epoch", content_epoch)
+    version = doc.pop("version", 0)
+    return SiteContent(**doc), version
+
+
+# ===== Content cache =====
+# The site content document changes rarely, so each worker keeps the validated
+# model in memory together with its encoded JSON (plain, gzip and brotli) so the
+# read path is a dict lookup plus a socket write. Every write bumps the `version`
+# field of the Mongo document; the TTL only bounds staleness for writes made
+# outside this process.
+CONTENT_CACHE_TTL = float(os.environ.get('CONTENT_CACHE_TTL', '300'))
+CONTENT_CACHE_CONTROL = os.environ.get('CONTENT_CACHE_CONTROL', 'public, max-age=0, must-revalidate')
+
+class ContentEntry:
+    __slots__ = ("content", "version", "body", "etag", "encoded")
+
+    def __init__(self, content: SiteContent, version: int):
+        self.content = content
+        self.version = version
+        self.body = content.model_dump_json().encode()
+        digest = hashlib.sha256(self.body).hexdigest()[:16]
+        self.etag = f'"{version}-{digest}"'
+        # Strong ETags must differ per content-coding, so each variant gets a suffix
+        self.encoded = {"identity": (self.body, self.etag)}
+        self.encoded["gzip"] = (gzip.compress(self.body, mtime=0), f'"{version}-{digest}-gzip"')
+        if brotli is not None:
+            self.encoded["br"] = (brotli.compress(self.body), f'"{version}-{digest}-br"')
+
+    def matches(self, if_none_match: str) -> bool:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or any(etag in tags for _, etag in self.encoded.values())
+
+    def negotiate(self, accept_encoding: str) -> str:
+        accepted = set()
+        for part in accept_encoding.split(","):
+            coding, _, params = part.partition(";")
+            q = params.strip().removeprefix("q=")
+            try:
+                if q and float(q) == 0:
+                    continue
+            except ValueError:
+                continue
+            accepted.add(coding.strip().lower())
+        for coding in ("br", "gzip"):
+            if coding in self.encoded and (coding in accepted or "*" in accepted):
+                return coding
+        return "identity"
+
+class ContentCache:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.entry: Optional[ContentEntry] = None
+        self.version = -1
+        self.expires_at = 0.0
+        # Called with the new entry whenever a newer version is cached
+        self.listeners: List[Callable[[ContentEntry], None]] = []
+
+    def get(self) -> Optional[ContentEntry]:
+        if self.entry is None or time.monotonic() >= self.expires_at:
+            return None
+        return self.entry
+
+    def set(self, content: SiteContent, version: int) -> None:
+        # Never let a slow reader overwrite a newer version with an older one
+        if version < self.version:
+            return
+        if self.entry is None or self.entry.version != version:
+            self.entry = ContentEntry(content, version)
+        newer = version > self.version
+        self.version = version
+        self.expires_at = time.monotonic() + self.ttl
+        if newer:
+            for listener in self.listeners:
+                listener(self.entry)
+
+    def invalidate(self) -> None:
+        # Forget the version too: a reseeded document starts counting again from 0
+        self.entry = None
+        self.version = -1
+        self.expires_at = 0.0
+
+content_cache = ContentCache(CONTENT_CACHE_TTL)
+
+
+# ===== Static content snapshot =====
+# When CONTENT_SNAPSHOT_DIR is set, every new content version is also published
+# as static files (content.json, content.v<N>.json, optionally an index.html
+# with the content inlined) for nginx / a CDN to serve without hitting the API.
+CONTENT_SNAPSHOT_DIR = os.environ.get('CONTENT_SNAPSHOT_DIR', '')
+CONTENT_SNAPSHOT_HTML_TEMPLATE = os.environ.get('CONTENT_SNAPSHOT_HTML_TEMPLATE', '')
+CONTENT_SNAPSHOT_KEEP = int(os.environ.get('CONTENT_SNAPSHOT_KEEP', '5'))
+
+def _snapshot_done(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Content snapshot: write failed", exc_info=future.exception())
+
+def publish_content_snapshot(entry: ContentEntry) -> None:
+    from snapshot import write_snapshot
+
+    # File I/O and fsync run in the default executor so the event loop never blocks on disk
+    future = asyncio.get_running_loop().run_in_executor(
+        None,
+        write_snapshot,
+        Path(CONTENT_SNAPSHOT_DIR),
+        entry.body,
+        entry.version,
+        entry.etag,
+        Path(CONTENT_SNAPSHOT_HTML_TEMPLATE) if CONTENT_SNAPSHOT_HTML_TEMPLATE else None,
+        CONTENT_SNAPSHOT_KEEP,
+        content_epoch,
+    )
+    future.add_done_callback(_snapshot_done)
+
+if CONTENT_SNAPSHOT_DIR:
+    content_cache.listeners.append(publish_content_snapshot)
+
+
+# ===== Content change events =====
+# GET /api/content/events is a Server-Sent Events stream. Every new content
+# version reaching this worker's cache (local writes and cross-worker sync alike)
+# is broadcast as a small notification; clients refetch GET /api/content.
+CONTENT_EVENTS_HEARTBEAT = float(os.environ.get('CONTENT_EVENTS_HEARTBEAT', '15'))
+CONTENT_EVENTS_QUEUE = int(os.environ.get('CONTENT_EVENTS_QUEUE', '8'))
+CONTENT_EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('CONTENT_EVENTS_MAX_SUBSCRIBERS', '10000'))
+# uvicorn waits for open responses on shutdown; streams end (and clients reconnect) after this long
+CONTENT_EVENTS_MAX_LIFETIME = float(os.environ.get('CONTENT_EVENTS_MAX_LIFETIME', '60'))
+
+content_events = Broadcaster(max_queue=CONTENT_EVENTS_QUEUE, max_subscribers=CONTENT_EVENTS_MAX_SUBSCRIBERS)
+content_events_last: Optional[ContentEntry] = None
+
+def content_event(entry: ContentEntry, previous: Optional[ContentEntry] = None) -> bytes:
+    sections = None
+    if previous is not None:
+        sections = [name for name in SiteContent.model_fields if getattr(previous.content, name) != getattr(entry.content, name)]
+    data = json.dumps({"version": entry.version, "etag": entry.etag, "sections": sections})
+    return format_event("content", data, event_id=str(entry.version))
+
+def publish_content_event(entry: ContentEntry) -> None:
+    global content_events_last
+    if content_events.subscribers:
+        content_events.publish(content_event(entry, content_events_last))
+    content_events_last = entry
+
+content_cache.listeners.append(publish_content_event)
+
+
+# Single-flight loader: concurrent cache misses share one in-flight Mongo read
+content_load: Optional[asyncio.Task] = None
+
+def cache_content_doc(doc: dict) -> ContentEntry:
+    if doc.get("epoch", content_epoch) != content_epoch:
+        # The document was recreated (reset or different database); its versions are not comparable
+        content_cache.invalidate()
+    content, version = content_from_doc(doc)
+    content_cache.set(content, version)
+    # A concurrent write may already have cached a newer version; serve that one
+    return content_cache.entry or ContentEntry(content, version)
+
+async def _load_content() -> ContentEntry:
+    return cache_content_doc(await read_content())
+
+async def load_content() -> ContentEntry:
+    global content_load
+    if content_load is None or content_load.done():
+        content_load = asyncio.create_task(_load_content())
+    # Shield so one cancelled request does not abort the read for everyone waiting on it
+    return await asyncio.shield(content_load)
+
+
+async def get_content_entry() -> ContentEntry:
+    return content_cache.get() or await load_content()
+
+
+# ===== Cross-worker content sync =====
+# Each uvicorn worker has its own content cache. A background task follows the
+# site_content change stream and pushes new versions into the local cache; on a
+# standalone mongod (no change streams) it polls the version field instead.
+CONTENT_SYNC_MODE = os.environ.get('CONTENT_SYNC_MODE', 'auto')  # auto | poll | off
+CONTENT_SYNC_POLL_INTERVAL = float(os.environ.get('CONTENT_SYNC_POLL_INTERVAL', '2'))
+CONTENT_SYNC_RETRY_DELAY = 5.0
+CHANGE_STREAMS_UNSUPPORTED = 40573  # "The $changeStream stage is only supported on replica sets"
+
+
+async def refresh_content_if_stale() -> None:
+    doc = await db.site_content.find_one({"_id": "kog_site"}, {"version": 1, "epoch": 1})
+    if doc is None:
+        if content_cache.version >= 0:
+            content_cache.invalidate()  # deleted; the next read reseeds it
+        return
+    if doc.get("version", 0) > content_cache.version or doc.get("epoch", content_epoch) != content_epoch:
+        doc = await db.site_content.find_one({"_id": "kog_site"})
+        if doc:
+            cache_content_doc(doc)
+
+
+async def watch_content_changes() -> None:
+    pipeline = [{"$match": {"documentKey._id": "kog_site"}}]
+    async with db.site_content.watch(pipeline, full_document="updateLookup") as stream:
+        # Catch up on anything written before the stream was opened
+        await refresh_content_if_stale()
+        async for change in stream:
+            doc = change.get("fullDocument")
+            if doc:
+                cache_content_doc(doc)
+            elif change.get("operationType") == "delete":
+                content_cache.invalidate()
+
+
+async def poll_content_version() -> None:
+    while True:
+        try:
+            await refresh_content_if_stale()
+        except Exception:
+            logger.exception("Content sync: version poll failed")
+        await asyncio.sleep(CONTENT_SYNC_POLL_INTERVAL)
+
+
+async def sync_content_cache() -> None:
+    if CONTENT_SYNC_MODE == "poll":
+        await poll_content_version()
+    while True:
+        try:
+            await watch_content_changes()
+        except (OperationFailure, NotImplementedError) as e:
+            if isinstance(e, OperationFailure) and e.code != CHANGE_STREAMS_UNSUPPORTED:
+                logger.warning("Content sync: change stream failed (%s); reopening", e)
+                await asyncio.sleep(CONTENT_SYNC_RETRY_DELAY)
+                continue
+            logger.info("Content sync: change streams unavailable; polling every %ss", CONTENT_SYNC_POLL_INTERVAL)
+            await poll_content_version()
+        except Exception:
+            logger.exception("Content sync: change stream failed; reopening")
+            await asyncio.sleep(CONTENT_SYNC_RETRY_DELAY)
+
+
+# ===== Status write pipeline =====
+# STATUS_WRITE_MODE=batched routes POST /api/status through a write-behind queue
+# flushed with insert_many; "direct" (default) keeps one insert_one per request.
+STATUS_WRITE_MODE = os.environ.get('STATUS_WRITE_MODE', 'direct')
+STATUS_WRITE_DURABILITY = os.environ.get('STATUS_WRITE_DURABILITY', 'flush')  # flush | enqueue
+STATUS_BATCH_SIZE = int(os.environ.get('STATUS_BATCH_SIZE', '500'))
+STATUS_BATCH_INTERVAL_MS = float(os.environ.get('STATUS_BATCH_INTERVAL_MS', '50'))
+STATUS_QUEUE_MAX = int(os.environ.get('STATUS_QUEUE_MAX', '10000'))
+STATUS_BULK_MAX_ITEMS = int(os.environ.get('STATUS_BULK_MAX_ITEMS', '10000'))
+STATUS_BULK_CHUNK_SIZE = int(os.environ.get('STATUS_BULK_CHUNK_SIZE', '1000'))
+STATUS_BULK_MAX_BYTES = int(os.environ.get('STATUS_BULK_MAX_BYTES', str(4 * 1024 * 1024)))
+
+status_writer: Optional["StatusWriteBuffer"] = None
+
+
+# ===== Status query helpers =====
+def as_utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    # Status timestamps are stored as naive UTC (datetime.utcnow)
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def status_filter(since: Optional[datetime], until: Optional[datetime], client_name: Optional[str]) -> dict:
+    query: dict = {}
+    timestamp = {}
+    if since is not None:
+        timestamp["$gte"] = as_utc_naive(since)
+    if until is not None:
+        timestamp["$lt"] = as_utc_naive(until)
+    if timestamp:
+        query["timestamp"] = timestamp
+    if client_name is not None:
+        query["client_name"] = client_name
+    return query
+
+
+# ===== Status analytics =====
+# Aggregations run in Mongo ($group / $dateTrunc). A bucket that ended more than
+# STATUS_STATS_CLOSED_GRACE seconds ago cannot change any more, so its count is
+# cached on its own for STATUS_STATS_CLOSED_TTL and a rolling window only queries
+# the buckets it has not seen yet. The grace period must exceed the write-behind
+# delay (STATUS_BATCH_INTERVAL_MS) so late-flushed rows are counted. Newer buckets
+# and per-client totals use the short TTL.
+STATUS_STATS_TTL = float(os.environ.get('STATUS_STATS_TTL', '5'))
+STATUS_STATS_CLOSED_TTL = float(os.environ.get('STATUS_STATS_CLOSED_TTL', '3600'))
+STATUS_STATS_CLOSED_GRACE = max(
+    float(os.environ.get('STATUS_STATS_CLOSED_GRACE', '30')), 2 * STATUS_BATCH_INTERVAL_MS / 1000
+)
+STATUS_STATS_BUCKET_CACHE = int(os.environ.get('STATUS_STATS_BUCKET_CACHE', '20000'))
+STATUS_STATS_MAX_BUCKETS = int(os.environ.get('STATUS_STATS_MAX_BUCKETS', '10000'))
+STATUS_STATS_DEFAULT_BUCKETS = {"minute": 60, "hour": 48, "day": 30}
+STATUS_STATS_STEPS = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+class StatsCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[tuple, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: tuple, value: Any, ttl: float) -> None:
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+stats_cache = StatsCache()
+bucket_cache = StatsCache(STATUS_STATS_BUCKET_CACHE)
+
+
+def truncate_timestamp(value: datetime, unit: str) -> datetime:
+    value = value.replace(second=0, microsecond=0)
+    if unit in ("hour", "day"):
+        value = value.replace(minute=0)
+    if unit == "day":
+        value = value.replace(hour=0)
+    return value
+
+
+async def aggregate_status_buckets(unit: str, since: datetime, until: Optional[datetime], client_name: Optional[str]) -> list:
+    pipeline = [
+        {"$match": status_filter(since, until, client_name)},
+        {"$group": {"_id": {"$dateTrunc": {"date": "$timestamp", "unit": unit}}, "count": {"$sum": 1}}},
+        {"$sort": {"_id": 1}},
+        {"$project": {"_id": 0, "bucket": "$_id", "count": 1}},
+    ]
+    return await db.status_checks.aggregate(pipeline).to_list(None)
+
+
+async def closed_status_buckets(unit: str, since: datetime, until: datetime, client_name: Optional[str]) -> list:
+    step = STATUS_STATS_STEPS[unit]
+    if (until - since) // step > bucket_cache.max_entries // 2:
+        # Too wide to cache bucket by bucket without evicting everything else
+        return await aggregate_status_buckets(unit, since, until, client_name)
+    starts = []
+    start = since
+    while start < until:
+        starts.append(start)
+        start += step
+    counts: Dict[datetime, int] = {}
+    runs: List[List[datetime]] = []
+    for start in starts:
+        count = bucket_cache.get(("bucket", unit, client_name, start))
+        if count is not None:
+            counts[start] = count
+        elif runs and runs[-1][-1] + step == start:
+            runs[-1].append(start)
+        else:
+            runs.append([start])
+    # One aggregation per contiguous run of uncached buckets; usually just the newly closed one
+    for run in runs:
+        rows = await aggregate_status_buckets(unit, run[0], run[-1] + step, client_name)
+        found = {row["bucket"]: row["count"] for row in rows}
+        for start in run:
+            counts[start] = found.get(start, 0)
+            bucket_cache.set(("bucket", unit, client_name, start), counts[start], STATUS_STATS_CLOSED_TTL)
+    return [{"bucket": start, "count": counts[start]} for start in starts if counts[start]]
+
+
+async def get_status_timeline(unit: str, since: Optional[datetime], until: Optional[datetime], client_name: Optional[str]) -> list:
+    now = datetime.utcnow()
+    current = truncate_timestamp(now, unit)
+    if since is None:
+        since = current - STATUS_STATS_DEFAULT_BUCKETS[unit] * STATUS_STATS_STEPS[unit]
+    since = truncate_timestamp(since, unit)
+    buckets = ((until or now) - since) // STATUS_STATS_STEPS[unit]
+    if buckets > STATUS_STATS_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Range spans {buckets} {unit} buckets; at most {STATUS_STATS_MAX_BUCKETS}, use a coarser unit",
+        )
+    # Buckets ending before this boundary are closed; a partial bucket at `until` never is
+    closed_until = truncate_timestamp(now - timedelta(seconds=STATUS_STATS_CLOSED_GRACE), unit)
+    if until is not None:
+        closed_until = min(closed_until, truncate_timestamp(until, unit))
+    rows = []
+    if since < closed_until:
+        rows.extend(await closed_status_buckets(unit, since, closed_until, client_name))
+    open_since = max(since, closed_until)
+    if until is None or until > open_since:
+        key = ("timeline-open", unit, client_name, open_since, until)
+        open_rows = stats_cache.get(key)
+        if open_rows is None:
+            open_rows = await aggregate_status_buckets(unit, open_since, until, client_name)
+            stats_cache.set(key, open_rows, STATUS_STATS_TTL)
+        rows.extend(open_rows)
+    return rows
+
+
+async def get_status_client_stats(since: Optional[datetime], until: Optional[datetime]) -> list:
+    key = ("clients", since, until)
+    rows = stats_cache.get(key)
+    if rows is None:
+        pipeline = [
+            {"$match": status_filter(since, until, None)},
+            {"$group": {
+                "_id": "$client_name",
+                "count": {"$sum": 1},
+                "first_seen": {"$min": "$timestamp"},
+                "last_seen": {"$max": "$timestamp"},
+            }},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$project": {"_id": 0, "client_name": "$_id", "count": 1, "first_seen": 1, "last_seen": 1}},
+        ]
+        rows = await db.status_checks.aggregate(pipeline).to_list(None)
+        stats_cache.set(key, rows, STATUS_STATS_TTL)
+    return rows
+
+
+# ===== Status retention =====
+# STATUS_RETENTION_DAYS > 0 adds a TTL index that expires raw status checks after
+# that many days. Before expiry, a background job compacts them into per-client
+# hourly and daily rollups (status_rollups_hourly / status_rollups_daily), running
+# STATUS_ROLLUP_LEAD_HOURS ahead of the TTL. 0 (default) keeps raw rows forever.
+STATUS_RETENTION_DAYS = float(os.environ.get('STATUS_RETENTION_DAYS', '0'))
+STATUS_ROLLUP_LEAD_HOURS = float(os.environ.get('STATUS_ROLLUP_LEAD_HOURS', '24'))
+STATUS_ROLLUP_INTERVAL = float(os.environ.get('STATUS_ROLLUP_INTERVAL', '3600'))
+STATUS_ROLLUP_COLLECTIONS = {"hour": "status_rollups_hourly", "day": "status_rollups_daily"}
+STATUS_ROLLUP_MAX_ROWS = int(os.environ.get('STATUS_ROLLUP_MAX_ROWS', '10000'))
+
+status_retention: Optional["StatusRetention"] = None
+
+
+async def get_status_rollups(unit: str, since: Optional[datetime], until: Optional[datetime],
+                             client_name: Optional[str], limit: int) -> list:
+    query: dict = {}
+    bucket = {}
+    if since is not None:
+        bucket["$gte"] = truncate_timestamp(since, unit)
+    if until is not None:
+        bucket["$lt"] = until
+    if bucket:
+        query["bucket"] = bucket
+    if client_name is not None:
+        query["client_name"] = client_name
+    projection = {"_id": 0, "client_name": 1, "bucket": 1, "count": 1, "first_seen": 1, "last_seen": 1}
+    cursor = db[STATUS_ROLLUP_COLLECTIONS[unit]].find(query, projection).sort([("bucket", 1), ("client_name", 1)])
+    return await cursor.limit(limit).to_list(limit)
+
+
+# ===== Partial content updates =====
+# PATCH /api/content accepts RFC 7396 merge patches or RFC 6902 JSON patches.
+# The patch is applied to the cached content, only the touched sections are
+# re-validated, and the edits become targeted $set / $push operations guarded by
+# the document version (If-Match), so concurrent admins cannot overwrite each other.
+SECTION_ADAPTERS = {name: TypeAdapter(field.annotation) for name, field in SiteContent.model_fields.items()}
+
+FieldPath = Tuple[Any, ...]
+
+
+def parse_content_version(if_match: Optional[str], version: Optional[int]) -> int:
+    if version is not None:
+        return version
+    if not if_match:
+        raise HTTPException(status_code=428, detail="Send If-Match with the content ETag (or ?version=) to update")
+    try:
+        return int(if_match.strip().removeprefix("W/").strip('"').split("-", 1)[0])
+    except ValueError:
+        raise HTTPException(status_code=412, detail="Unrecognised If-Match value")
+
+
+def parse_json_pointer(pointer: str) -> List[str]:
+    if not pointer.startswith("/"):
+        raise HTTPException(status_code=422, detail=f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def resolve_pointer(doc: dict, tokens: List[str], insert: bool = False) -> Tuple[Any, Any, FieldPath]:
+    """Return (parent container, key in parent, typed path) for a JSON pointer.
+
+    With insert=True (the add op) the last token may also point one past the end of an array.
+    """
+    if not tokens or tokens[0] not in SECTION_ADAPTERS:
+        raise HTTPException(status_code=422, detail=f"Unknown section in path /{'/'.join(tokens)}")
+    parent: Any = doc
+    path: List[Any] = []
+    for position, token in enumerate(tokens):
+        last = position == len(tokens) - 1
+        if isinstance(parent, list):
+            if token == "-" and last:
+                key: Any = "-"
+            elif token.isdigit() and int(token) < len(parent) + (1 if last and insert else 0):
+                key = int(token)
+            else:
+                raise HTTPException(status_code=422, detail=f"Invalid array index {token!r}")
+        elif isinstance(parent, dict) and token in parent:
+            # Models always dump every field, so unknown keys are never valid targets
+            key = token
+        else:
+            raise HTTPException(status_code=422, detail=f"Path not found: /{'/'.join(tokens)}")
+        if last:
+            return parent, key, tuple(path)
+        parent = parent[key]
+        path.append(key)
+    raise AssertionError("unreachable")
+
+
+def apply_json_patch(doc: dict, operations: list) -> List[Tuple[str, FieldPath]]:
+    changes: List[Tuple[str, FieldPath]] = []
+    for operation in operations:
+        if not isinstance(operation, dict) or "path" not in operation:
+            raise HTTPException(status_code=400, detail="Each JSON patch operation needs an op and a path")
+        op = operation.get("op")
+        parent, key, parent_path = resolve_pointer(doc, parse_json_pointer(operation["path"]), insert=op == "add")
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise HTTPException(status_code=400, detail=f"{op} requires a value")
+        if op == "test":
+            if key == "-" or (isinstance(parent, dict) and key not in parent) or parent[key] != operation["value"]:
+                raise HTTPException(status_code=409, detail=f"Test failed at {operation['path']}")
+            continue
+        value = copy.deepcopy(operation.get("value"))
+        if isinstance(parent, list):
+            if op == "add" and key == "-":
+                parent.append(value)
+                changes.append(("push", parent_path))
+            elif op == "replace" and key != "-" and key < len(parent):
+                parent[key] = value
+                changes.append(("set", parent_path + (key,)))
+            elif op == "add" and key != "-":
+                parent.insert(key, value)
+                changes.append(("set", parent_path))
+            elif op == "remove" and key != "-" and key < len(parent):
+                del parent[key]
+                changes.append(("set", parent_path))
+            else:
+                raise HTTPException(status_code=422, detail=f"Unsupported {op!r} at {operation['path']}")
+        elif op in ("add", "replace"):
+            parent[key] = value
+            changes.append(("set", parent_path + (key,)))
+        elif op == "remove":
+            if not parent_path:
+                raise HTTPException(status_code=422, detail=f"Section {key!r} cannot be removed")
+            del parent[key]
+            changes.append(("set", parent_path))
+        else:
+            raise HTTPException(status_code=422, detail=f"Unsupported {op!r} at {operation['path']}")
+    return changes
+
+
+def strip_nulls(value: Any) -> Any:
+    # A merge patch object applied to a non-object target is merged into {}, which drops its nulls
+    if isinstance(value, dict):
+        return {key: strip_nulls(item) for key, item in value.items() if item is not None}
+    return copy.deepcopy(value)
+
+
+def apply_merge_patch(target: dict, patch: dict, path: FieldPath = ()) -> List[Tuple[str, FieldPath]]:
+    changes: List[Tuple[str, FieldPath]] = []
+    for key, value in patch.items():
+        if key not in target:
+            raise HTTPException(status_code=422, detail=f"Unknown field {'.'.join(map(str, path + (key,)))!r}")
+        if value is None:
+            # RFC 7396: null removes the member; re-validation then restores the field default
+            if not path:
+                raise HTTPException(status_code=422, detail=f"Section {key!r} cannot be removed")
+            del target[key]
+            changes.append(("set", path))
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            changes += apply_merge_patch(target[key], value, path + (key,))
+        else:
+            target[key] = strip_nulls(value)
+            changes.append(("set", path + (key,)))
+    return changes
+
+
+def get_path(doc: Any, path: FieldPath) -> Any:
+    for key in path:
+        doc = doc[key]
+    return doc
+
+
+def build_content_update(changes: List[Tuple[str, FieldPath]], new_doc: dict, old_doc: dict) -> dict:
+    """Turn patch changes into a conflict-free Mongo update document."""
+    set_paths = {path for kind, path in changes if kind == "set"}
+    push_paths = {path for kind, path in changes if kind == "push"}
+    # Mongo rejects $push on an array alongside any other update under it; fall back to $set
+    for path in list(push_paths):
+        if any(other[:len(path)] == path for other in set_paths):
+            push_paths.discard(path)
+            set_paths.add(path)
+    # Drop paths already covered by a $set of one of their ancestors
+    set_paths = {path for path in set_paths if not any(path[:i] in set_paths for i in range(1, len(path)))}
+    push_paths = {path for path in push_paths if not any(path[:i] in set_paths for i in range(1, len(path) + 1))}
+    update: Dict[str, dict] = {}
+    if set_paths:
+        update["$set"] = {".".join(map(str, path)): get_path(new_doc, path) for path in set_paths}
+    if push_paths:
+        update["$push"] = {
+            ".".join(map(str, path)): {"$each": get_path(new_doc, path)[len(get_path(old_doc, path)):]}
+            for path in push_paths
+        }
+    return update
+
+
+async def patch_content(body: Any, json_patch: bool, expected_version: int) -> ContentEntry:
+    entry = await get_content_entry()
+    if entry.version != expected_version:
+        # Our cache may lag another worker; re-read before declaring a conflict
+        entry = await load_content()
+    if entry.version != expected_version:
+        raise HTTPException(status_code=412, detail=f"Content is at version {entry.version}, not {expected_version}")
+
+    old_doc = entry.content.model_dump()
+    new_doc = copy.deepcopy(old_doc)
+    if json_patch:
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="JSON patch body must be an array of operations")
+        changes = apply_json_patch(new_doc, body)
+    else:
+        if not isinstance(body, dict):
+            raise HTTPException(status_code=400, detail="Merge patch body must be an object")
+        changes = apply_merge_patch(new_doc, body)
+    if not changes:
+        return entry
+
+    sections = {name: getattr(entry.content, name) for name in SECTION_ADAPTERS}
+    for name in {path[0] for _, path in changes}:
+        try:
+            sections[name] = SECTION_ADAPTERS[name].validate_python(new_doc[name])
+        except ValidationError as e:
+            errors = e.errors(include_url=False, include_context=False)
+            raise HTTPException(status_code=422, detail=[{**error, "loc": (name, *error["loc"])} for error in errors])
+        new_doc[name] = SECTION_ADAPTERS[name].dump_python(sections[name])
+
+    update = build_content_update(changes, new_doc, old_doc)
+    update["$inc"] = {"version": 1}
+    update["$unset"] = {"revision": ""}
+    # Documents written before versioning have no version field; they count as version 0
+    version_filter = {"version": expected_version} if expected_version else {"version": {"$in": [0, None]}}
+    result = await db.site_content.update_one({"_id": "kog_site", **version_filter}, update)
+    if result.matched_count == 0:
+        raise HTTPException(status_code=412, detail="Content was modified concurrently; reload and retry")
+    content = SiteContent.model_construct(**sections)
+    content_cache.set(content, expected_version + 1)
+    await record_revision(content, expected_version + 1)
+    return content_cache.entry
+
+
+# ===== Content revisions =====
+# Every content write is kept as an immutable revision numbered by the document
+# version it produced. Revisions only reference sections by content hash, and
+# section bodies are stored once per hash, so unchanged sections cost nothing.
+# The live document carries a `revision` pointer only after a rollback; a
+# missing pointer means the live content is the revision equal to its version.
+known_section_hashes: set = set()
+
+
+class ContentRevision(BaseModel):
+    revision: int
+    created_at: datetime
+    sections: Dict[str, str]
+    current: bool = False
+
+
+def section_hash(data: Any) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+async def record_revision(content: SiteContent, version: int) -> None:
+    hashes, blobs = {}, []
+    for name, adapter in SECTION_ADAPTERS.items():
+        data = adapter.dump_python(getattr(content, name), mode="json")
+        digest = hashes[name] = section_hash(data)
+        if digest not in known_section_hashes:
+            blobs.append({"_id": digest, "section": name, "data": data})
+    try:
+        if blobs:
+            try:
+                await db.site_content_sections.insert_many(blobs, ordered=False)
+            except BulkWriteError as e:
+                # Duplicate hashes are expected (another worker stored them first)
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+            known_section_hashes.update(blob["_id"] for blob in blobs)
+        await db.site_content_revisions.insert_one(
+            {"_id": version, "sections": hashes, "created_at": datetime.utcnow()}
+        )
+    except Exception:
+        # The content write already succeeded; a missing revision must not fail the request
+        logger.exception("Content revisions: failed to record revision %s", version)
+
+
+async def load_revision(revision: int) -> SiteContent:
+    doc = await db.site_content_revisions.find_one({"_id": revision})
+    if doc is None:
+        raise HTTPException(status_code=404, detail=f"Revision {revision} not found")
+    hashes = doc["sections"]
+    blobs = await db.site_content_sections.find({"_id": {"$in": list(hashes.values())}}).to_list(None)
+    data = {blob["_id"]: blob["data"] for blob in blobs}
+    return SiteContent(**{name: data[digest] for name, digest in hashes.items()})
+
+
+async def current_revision() -> Optional[int]:
+    doc = await db.site_content.find_one({"_id": "kog_site"}, {"version": 1, "revision": 1})
+    if doc is None:
+        return None
+    return doc.get("revision", doc.get("version", 0))
+
+
+async def rollback_content(revision: int) -> ContentEntry:
+    content = await load_revision(revision)
+    doc = await db.site_content.find_one_and_update(
+        {"_id": "kog_site"},
+        {"$set": {**content.model_dump(), "revision": revision}, "$inc": {"version": 1}},
+        projection={"version": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    content_cache.set(content, doc["version"])
+    return content_cache.entry
 
 
 # ===== Routes =====
@@ -139,19 +978,222 @@ async def root():
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.model_dump()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.model_dump())
+    if status_writer is not None:
+        await status_writer.submit(status_obj.model_dump())
+    else:
+        _ = await db.status_checks.insert_one(status_obj.model_dump())
     return status_obj
 
+# Bulk ingest for agents that buffer check-ins. Accepts a JSON array or NDJSON
+# (Content-Type: application/x-ndjson); invalid items are reported by index and
+# the rest are inserted in unordered chunks.
+async def read_bulk_body(request: Request) -> bytes:
+    # Refuse oversized uploads before buffering or parsing them
+    too_large = HTTPException(status_code=413, detail=f"Body exceeds {STATUS_BULK_MAX_BYTES} bytes")
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > STATUS_BULK_MAX_BYTES:
+        raise too_large
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > STATUS_BULK_MAX_BYTES:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def parse_bulk_body(body: bytes, content_type: str) -> Tuple[List[Tuple[int, object]], List[StatusBulkError]]:
+    if "ndjson" in content_type:
+        items, errors = [], []
+        for index, line in enumerate(body.splitlines()):
+            if not line.strip():
+                continue
+            try:
+                items.append((index, json.loads(line)))
+            except ValueError as e:
+                errors.append(StatusBulkError(index=index, error=f"Invalid JSON: {e}"))
+        return items, errors
+    try:
+        items = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array")
+    return list(enumerate(items)), []
+
+@api_router.post("/status/bulk", response_model=StatusBulkResult)
+async def create_status_checks_bulk(request: Request):
+    items, errors = parse_bulk_body(await read_bulk_body(request), request.headers.get("content-type", ""))
+    if len(items) > STATUS_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {STATUS_BULK_MAX_ITEMS} items per request")
+    timestamp = datetime.utcnow()
+    docs, positions = [], []
+    for index, item in items:
+        try:
+            status_input = StatusCheckCreate.model_validate(item)
+        except ValidationError as e:
+            message = "; ".join(f"{'.'.join(map(str, err['loc'])) or 'item'}: {err['msg']}" for err in e.errors())
+            errors.append(StatusBulkError(index=index, error=message))
+            continue
+        docs.append({"id": str(uuid.uuid4()), "client_name": status_input.client_name, "timestamp": timestamp})
+        positions.append(index)
+    inserted = 0
+    for start in range(0, len(docs), STATUS_BULK_CHUNK_SIZE):
+        chunk = docs[start:start + STATUS_BULK_CHUNK_SIZE]
+        try:
+            result = await db.status_checks.insert_many(chunk, ordered=False)
+            inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            inserted += e.details.get("nInserted", 0)
+            for write_error in e.details.get("writeErrors", []):
+                index = positions[start + write_error["index"]]
+                errors.append(StatusBulkError(index=index, error=write_error.get("errmsg", "write failed")))
+    errors.sort(key=lambda error: error.index)
+    return StatusBulkResult(inserted=inserted, errors=errors)
+
+@api_router.get("/status/stats/timeline", response_model=List[StatusBucket])
+async def status_stats_timeline(
+    unit: Literal["minute", "hour", "day"] = "hour",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    client_name: Optional[str] = None,
+):
+    return await get_status_timeline(unit, as_utc_naive(since), as_utc_naive(until), client_name)
+
+@api_router.get("/status/stats/clients", response_model=List[StatusClientStats])
+async def status_stats_clients(since: Optional[datetime] = None, until: Optional[datetime] = None):
+    return await get_status_client_stats(as_utc_naive(since), as_utc_naive(until))
+
+@api_router.get("/status/rollups", response_model=List[StatusRollup])
+async def status_rollups(
+    unit: Literal["hour", "day"] = "day",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    client_name: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=STATUS_ROLLUP_MAX_ROWS),
+):
+    return await get_status_rollups(unit, as_utc_naive(since), as_utc_naive(until), client_name, limit)
+
+STATUS_CHECK_PROJECTION = {"_id": 0, "id": 1, "client_name": 1, "timestamp": 1}
+
+# Keyset pagination, newest first. The cursor is an opaque encoding of the last
+# (timestamp, id) pair returned; the next page cursor is sent in X-Next-Cursor.
+def encode_status_cursor(status_check: dict) -> str:
+    raw = json.dumps({"t": status_check["timestamp"].isoformat(), "i": status_check["id"]}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_status_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(data["t"]), str(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**{k: v for k, v in status_check.items() if k != "_id"}) for status_check in status_checks]
+async def get_status_checks(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+):
+    query = {}
+    if cursor:
+        timestamp, last_id = decode_status_cursor(cursor)
+        query = {"$or": [
+            {"timestamp": {"$lt": timestamp}},
+            {"timestamp": timestamp, "id": {"$lt": last_id}},
+        ]}
+    # Fetch one extra row to know whether another page exists
+    status_checks = await (
+        db.status_checks.find(query, STATUS_CHECK_PROJECTION)
+        .sort([("timestamp", -1), ("id", -1)])
+        .limit(limit + 1)
+        .to_list(limit + 1)
+    )
+    headers = {}
+    if len(status_checks) > limit:
+        status_checks = status_checks[:limit]
+        headers["X-Next-Cursor"] = encode_status_cursor(status_checks[-1])
+    # Rows are only ever written from StatusCheck models and the projection pins
+    # their shape, so they are serialized as-is instead of being validated into
+    # models twice (see benchmarks/status_models.py)
+    return ORJSONResponse(status_checks, headers=headers)
+
+# Streaming NDJSON export for audits. Documents are pulled from the Motor cursor
+# one batch at a time and each batch becomes one chunk, so memory stays constant
+# and a slow client stalls the cursor instead of buffering rows.
+@api_router.get("/status/export")
+async def export_status_checks(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    client_name: Optional[str] = None,
+    batch_size: int = Query(1000, ge=1, le=10000),
+    compress: bool = False,
+):
+    cursor = (
+        db.status_checks.find(status_filter(since, until, client_name), {"_id": 0})
+        .sort([("timestamp", 1), ("id", 1)])
+        .batch_size(batch_size)
+    )
+
+    async def ndjson_chunks():
+        compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31 -> gzip container
+        lines = []
+        async for status_check in cursor:
+            status_check["timestamp"] = status_check["timestamp"].isoformat()
+            lines.append(json.dumps(status_check))
+            if len(lines) >= batch_size:
+                chunk = ("\n".join(lines) + "\n").encode()
+                lines.clear()
+                yield compressor.compress(chunk) if compressor else chunk
+        tail = ("\n".join(lines) + "\n").encode() if lines else b""
+        if compressor:
+            tail = compressor.compress(tail) + compressor.flush()
+        if tail:
+            yield tail
+
+    filename = "status_checks.ndjson.gz" if compress else "status_checks.ndjson"
+    return StreamingResponse(
+        ndjson_chunks(),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
-# Public content fetch
+# Public content fetch. Served from pre-encoded bytes; response_model is kept for the schema docs.
 @api_router.get("/content", response_model=SiteContent)
-async def fetch_content():
-    content = await get_or_seed_content()
-    return content
+async def fetch_content(request: Request):
+    entry = await get_content_entry()
+    coding = entry.negotiate(request.headers.get("accept-encoding", ""))
+    body, etag = entry.encoded[coding]
+    headers = {"ETag": etag, "Cache-Control": CONTENT_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if entry.matches(request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Content change notifications. Reconnecting clients (Last-Event-ID) or callers
+# passing ?version= get the current version at once if they are behind.
+@api_router.get("/content/events", include_in_schema=False)
+async def content_events_stream(request: Request, version: Optional[int] = None):
+    if content_events.full():
+        raise HTTPException(status_code=503, detail="Too many subscribers", headers={"Retry-After": "30"})
+    last_seen = request.headers.get("last-event-id")
+    if last_seen is not None and last_seen.isdigit():
+        version = int(last_seen)
+    await get_content_entry()
+
+    def opening() -> bytes:
+        entry = content_cache.entry
+        if entry is None:
+            return b""
+        if version is not None and entry.version > version:
+            return content_event(entry)
+        # A bare id sets the client's Last-Event-ID, so its next reconnect can catch up
+        return f"id: {entry.version}\n\n".encode()
+
+    return StreamingResponse(
+        content_events.stream(CONTENT_EVENTS_HEARTBEAT, CONTENT_EVENTS_MAX_LIFETIME, opening),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # Admin update content (simple full replace). In future, protect via auth.
 class SiteContentUpdate(SiteContent):
@@ -159,20 +1201,100 @@ class SiteContentUpdate(SiteContent):
 
 @api_router.put("/content", response_model=SiteContent)
 async def update_content(payload: SiteContentUpdate):
-    await db.site_content.update_one({"_id": "kog_site"}, {"$set": payload.model_dump()}, upsert=True)
+    global content_epoch
+    doc = await db.site_content.find_one_and_update(
+        {"_id": "kog_site"},
+        {
+            "$set": payload.model_dump(),
+            "$inc": {"version": 1},
+            "$unset": {"revision": ""},
+            "$setOnInsert": {"epoch": new_content_epoch()},
+        },
+        projection={"version": 1, "epoch": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    content_epoch = doc.get("epoch", content_epoch)
+    content_cache.set(payload, doc["version"])
+    await record_revision(payload, doc["version"])
     return payload
 
+@api_router.patch("/content", response_model=SiteContent)
+async def patch_content_route(request: Request, version: Optional[int] = None):
+    try:
+        body = json.loads(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+    json_patch = "json-patch" in request.headers.get("content-type", "")
+    expected_version = parse_content_version(request.headers.get("if-match"), version)
+    entry = await patch_content(body, json_patch, expected_version)
+    return Response(content=entry.body, media_type="application/json", headers={"ETag": entry.etag})
+
+@api_router.get("/content/revisions", response_model=List[ContentRevision])
+async def list_content_revisions(limit: int = Query(50, ge=1, le=500), before: Optional[int] = None):
+    query = {} if before is None else {"_id": {"$lt": before}}
+    docs = await db.site_content_revisions.find(query).sort("_id", -1).limit(limit).to_list(limit)
+    current = await current_revision()
+    return [
+        ContentRevision(revision=doc["_id"], created_at=doc["created_at"], sections=doc["sections"], current=doc["_id"] == current)
+        for doc in docs
+    ]
+
+@api_router.get("/content/revisions/{revision}", response_model=SiteContent)
+async def get_content_revision(revision: int):
+    return await load_revision(revision)
+
+@api_router.post("/content/revisions/{revision}/rollback", response_model=SiteContent)
+async def rollback_content_route(revision: int):
+    entry = await rollback_content(revision)
+    return Response(content=entry.body, media_type="application/json", headers={"ETag": entry.etag})
+
 # Include the router in the main app
 app.include_router(api_router)
 
+# Rate limiting and load shedding sit inside CORS so rejections still carry CORS headers
+RATE_LIMITS = os.environ.get(
+    'RATE_LIMITS',
+    'POST /api/status=20:40,POST /api/status/bulk=2:5,PUT /api/content=1:5,'
+    'PATCH /api/content=1:5,POST /api/content/revisions/*=1:3',
+)
+READ_MAX_CONCURRENCY = int(os.environ.get('READ_MAX_CONCURRENCY', '512'))
+READ_MAX_QUEUE_MS = float(os.environ.get('READ_MAX_QUEUE_MS', '1000'))
+WRITE_MAX_CONCURRENCY = int(os.environ.get('WRITE_MAX_CONCURRENCY', '32'))
+WRITE_MAX_QUEUE_MS = float(os.environ.get('WRITE_MAX_QUEUE_MS', '100'))
+
+app.add_middleware(
+    LoadSheddingMiddleware,
+    rate_limiter=TokenBucketLimiter(parse_rate_limits(RATE_LIMITS)),
+    read_limiter=ConcurrencyLimiter(READ_MAX_CONCURRENCY, READ_MAX_QUEUE_MS / 1000),
+    write_limiter=ConcurrencyLimiter(WRITE_MAX_CONCURRENCY, WRITE_MAX_QUEUE_MS / 1000),
+    # SSE streams stay open indefinitely and would pin read slots; they have their own cap
+    exempt_paths=("/metrics", "/api/content/events"),
+    # Number of reverse proxies in front of the app that append to X-Forwarded-For
+    trusted_proxies=int(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', '0')),
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+# Added last so it is the outermost middleware and its timings include CORS handling
+app.add_middleware(MetricsMiddleware, registry=metrics)
+
+METRICS_ALLOWED_CLIENTS = set(os.environ.get('METRICS_ALLOWED_CLIENTS', '127.0.0.1,::1').split(','))
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint(request: Request):
+    # Local scrape endpoint only; hide it from everyone else
+    if request.client is None or request.client.host not in METRICS_ALLOWED_CLIENTS:
+        raise HTTPException(status_code=404)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -180,6 +1302,61 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
+async def create_indexes():
+    if STATUS_RETENTION_DAYS > 0:
+        from retention import StatusRetention
+
+        retention_indexes = StatusRetention(db, STATUS_RETENTION_DAYS).ensure_indexes()
+    else:
+        from retention import drop_ttl_index
+
+        retention_indexes = drop_ttl_index(db)
+    # Independent round trips; issue them together rather than one after another
+    await asyncio.gather(
+        db.status_checks.create_index([("timestamp", -1), ("id", -1)], name="timestamp_id"),
+        db.status_checks.create_index([("client_name", 1), ("timestamp", 1)], name="client_name_timestamp"),
+        retention_indexes,
+    )
+
+async def warm_content():
+    await seed_content()
+    await load_content()
+
+def start_content_sync():
+    app.state.content_sync = None
+    if CONTENT_SYNC_MODE != "off":
+        app.state.content_sync = asyncio.create_task(sync_content_cache())
+
+def start_status_writer():
+    global status_writer
+    if STATUS_WRITE_MODE == "batched":
+        from status_writer import StatusWriteBuffer
+
+        status_writer = StatusWriteBuffer(
+            db.status_checks,
+            batch_size=STATUS_BATCH_SIZE,
+            flush_interval=STATUS_BATCH_INTERVAL_MS / 1000,
+            max_queue=STATUS_QUEUE_MAX,
+            durability=STATUS_WRITE_DURABILITY,
+        )
+        status_writer.start()
+
+def start_status_retention():
+    global status_retention
+    app.state.status_retention = None
+    if STATUS_RETENTION_DAYS > 0:
+        from retention import StatusRetention
+
+        status_retention = StatusRetention(
+            db, STATUS_RETENTION_DAYS, lead_hours=STATUS_ROLLUP_LEAD_HOURS, interval=STATUS_ROLLUP_INTERVAL
+        )
+        app.state.status_retention = asyncio.create_task(status_retention.run_forever())
+
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    if app.state.content_sync is not None:
+        app.state.content_sync.cancel()
+    if app.state.status_retention is not None:
+        app.state.status_retention.cancel()
+    if status_writer is not None:
+        await status_writer.drain()
+    client.close()
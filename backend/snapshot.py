@@ -0,0 +1,111 @@
+import fcntl
+import json
+import logging
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+VERSIONED_NAME = re.compile(r"^content\.v(\d+)\.json$")
+INLINE_SCRIPT_ID = "kog-content"
+LOCK_NAME = ".snapshot.lock"
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Write via a temp file in the same directory and rename over the target,
+    so readers (nginx, a CDN origin pull) never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.chmod(tmp_path, 0o644)  # mkstemp creates 0600; the web server must be able to read it
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+@contextmanager
+def _directory_lock(directory: Path) -> Iterator[None]:
+    # flock is held per open file, so it serialises threads and every uvicorn worker alike
+    with open(directory / LOCK_NAME, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_meta(directory: Path) -> Optional[dict]:
+    try:
+        return json.loads((directory / "content-meta.json").read_bytes())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _versions_on_disk(directory: Path) -> list:
+    versions = []
+    for name in os.listdir(directory):
+        match = VERSIONED_NAME.match(name)
+        if match:
+            versions.append(int(match.group(1)))
+    return sorted(versions)
+
+
+def inline_into_html(template: str, body: bytes) -> str:
+    # "</" inside a JSON string would end the <script> element early
+    payload = body.decode().replace("</", "<\\/")
+    tag = f'<script id="{INLINE_SCRIPT_ID}" type="application/json">{payload}</script>'
+    existing = re.compile(rf'<script id="{INLINE_SCRIPT_ID}" type="application/json">.*?</script>', re.S)
+    if existing.search(template):
+        return existing.sub(lambda _: tag, template)
+    return template.replace("</head>", f"{tag}</head>", 1)
+
+
+def write_snapshot(directory: Path, body: bytes, version: int, etag: str,
+                   html_template: Optional[Path] = None, keep: int = 5, epoch: str = "") -> bool:
+    """Publish content version `version` as static files in `directory`.
+
+    Writes content.v<version>.json (immutable, cacheable forever), then points
+    content.json / content-meta.json (and optionally index.html with the content
+    inlined) at it. `epoch` identifies the database the versions count in: a
+    snapshot from another epoch (a reset or different database) is replaced
+    whatever its version. Returns False when the published snapshot is already
+    at this version or newer.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    with _directory_lock(directory):
+        meta = _read_meta(directory)
+        same_epoch = meta is not None and meta.get("epoch", "") == epoch
+        if same_epoch and meta.get("version", -1) >= version:
+            if meta["version"] > version:
+                logger.info("Content snapshot: skipped version %d, version %d is already published",
+                            version, meta["version"])
+            return False
+        if meta is not None and not same_epoch:
+            logger.warning("Content snapshot: replacing version %s from another database epoch with version %d",
+                           meta.get("version"), version)
+        atomic_write(directory / f"content.v{version}.json", body)
+        atomic_write(directory / "content.json", body)
+        meta = {"version": version, "etag": etag, "file": f"content.v{version}.json", "epoch": epoch}
+        atomic_write(directory / "content-meta.json", json.dumps(meta).encode())
+        if html_template is not None:
+            html = inline_into_html(html_template.read_text(encoding="utf-8"), body)
+            atomic_write(directory / "index.html", html.encode("utf-8"))
+        # Files from another epoch have unrelated numbers; only this epoch's recent versions are kept
+        versions = [v for v in _versions_on_disk(directory) if v <= version] if same_epoch else [version]
+        for old in set(_versions_on_disk(directory)) - set(versions[-keep:]):
+            try:
+                os.unlink(directory / f"content.v{old}.json")
+            except FileNotFoundError:
+                pass
+        return True
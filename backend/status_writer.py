@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_LEVELS = ("flush", "enqueue")
+
+
+class StatusWriteBuffer:
+    """Write-behind queue for status checks.
+
+    Callers enqueue documents; a single background task writes them with
+    insert_many(ordered=False) once batch_size documents are waiting or
+    flush_interval seconds have passed since the first one arrived. The queue is
+    bounded, so producers wait (rather than grow memory) when Mongo falls behind.
+
+    durability="flush" makes submit() wait until its document is acknowledged by
+    Mongo; durability="enqueue" returns as soon as the document is queued.
+    """
+
+    def __init__(self, collection, batch_size: int = 500, flush_interval: float = 0.05,
+                 max_queue: int = 10000, durability: str = "flush"):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"durability must be one of {DURABILITY_LEVELS}, got {durability!r}")
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.durability = durability
+        self.queue: "asyncio.Queue[Tuple[dict, Optional[asyncio.Future]]]" = asyncio.Queue(maxsize=max_queue)
+        self.closing = False
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self._run())
+
+    async def submit(self, doc: dict) -> None:
+        if self.closing:
+            raise RuntimeError("status write buffer is shutting down")
+        future = asyncio.get_running_loop().create_future() if self.durability == "flush" else None
+        await self.queue.put((doc, future))
+        if future is not None:
+            await future
+
+    async def drain(self, timeout: float = 10.0) -> None:
+        """Stop accepting writes and wait for everything queued to be flushed."""
+        self.closing = True
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.error("Status writer: %d queued writes lost on shutdown", self.queue.qsize())
+        if self.task is not None:
+            self.task.cancel()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[dict, Optional[asyncio.Future]]]) -> None:
+        errors: dict = {}
+        try:
+            await self.collection.insert_many([doc for doc, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                errors[error["index"]] = RuntimeError(error.get("errmsg", "write failed"))
+        except Exception as e:
+            logger.exception("Status writer: batch of %d failed", len(batch))
+            errors = {index: e for index in range(len(batch))}
+        if errors and self.durability == "enqueue":
+            logger.error("Status writer: %d of %d writes failed", len(errors), len(batch))
+        for index, (_, future) in enumerate(batch):
+            if future is not None and not future.done():
+                if index in errors:
+                    future.set_exception(errors[index])
+                else:
+                    future.set_result(None)
+            self.queue.task_done()
@@ -3,19 +3,53 @@ import axios from "axios";
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = BACKEND_URL ? `${BACKEND_URL}/api` : "/api";
+// Static snapshot written by the backend on every content change (served by nginx/CDN)
+const SNAPSHOT_URL = process.env.REACT_APP_CONTENT_SNAPSHOT_URL;
 
-export function useContent() {
+function readInlinedContent() {
+  const el = typeof document !== "undefined" && document.getElementById("kog-content");
+  if (!el) return null;
+  try {
+    return JSON.parse(el.textContent);
+  } catch (e) {
+    return null;
+  }
+}
+
+// Pass { fresh: true } to always read from the API (e.g. admin edits need its ETag)
+export function useContent({ fresh = false } = {}) {
   const [data, setData] = useState(null);
+  const [etag, setEtag] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
   useEffect(() => {
     let mounted = true;
     async function fetchContent() {
+      if (!fresh) {
+        const inlined = readInlinedContent();
+        if (inlined) {
+          setData(inlined);
+          setLoading(false);
+          return;
+        }
+        if (SNAPSHOT_URL) {
+          try {
+            const res = await axios.get(SNAPSHOT_URL, { timeout: 5000 });
+            if (!mounted) return;
+            setData(res.data);
+            setLoading(false);
+            return;
+          } catch (e) {
+            // fall back to the API below
+          }
+        }
+      }
       try {
         const res = await axios.get(`${API}/content`, { timeout: 15000 });
         if (!mounted) return;
         setData(res.data);
+        setEtag(res.headers?.etag || null);
       } catch (e) {
         setError(e?.message || "Failed to load content");
       } finally {
@@ -24,10 +58,37 @@ export function useContent() {
     }
     fetchContent();
     return () => { mounted = false; };
-  }, []);
+  }, [fresh]);
+
+  // Refetch when the backend announces a new content version over Server-Sent Events
+  useEffect(() => {
+    if (fresh || typeof EventSource === "undefined") return undefined;
+    let active = true;
+    let timer;
+    const source = new EventSource(`${API}/content/events`);
+    source.addEventListener("content", () => {
+      clearTimeout(timer);
+      // Spread the refetches so every open tab does not hit the API in the same instant
+      timer = setTimeout(async () => {
+        try {
+          const res = await axios.get(`${API}/content`, { timeout: 15000 });
+          if (!active) return;
+          setData(res.data);
+          setEtag(res.headers?.etag || null);
+        } catch (e) {
+          // keep showing the current content; the next event retries
+        }
+      }, Math.random() * 2000);
+    });
+    return () => {
+      active = false;
+      clearTimeout(timer);
+      source.close();
+    };
+  }, [fresh]);
 
   const contract = useMemo(() => data?.config?.contractAddress || "", [data]);
   const ctas = useMemo(() => data?.hero?.ctas || {}, [data]);
 
-  return { data, loading, error, contract, ctas };
+  return { data, etag, loading, error, contract, ctas };
 }
\ No newline at end of file
@@ -10,10 +10,11 @@ const API = BACKEND_URL ? `${BACKEND_URL}/api` : "/api";
 const ADMIN_PASSWORD = "KOG2025"; // demo only; no real security
 
 export default function Admin() {
-  const { data, loading, error } = useContent();
+  const { data, etag, loading, error } = useContent({ fresh: true });
   const { toast } = useToast();
 
   const [authed, setAuthed] = useState(false);
+  const [version, setVersion] = useState(null);
   const [pass, setPass] = useState(localStorage.getItem("KOG_ADMIN_PASS") || "");
 
   const [form, setForm] = useState({
@@ -34,6 +35,10 @@ export default function Admin() {
     }
   }, [data]);
 
+  useEffect(() => {
+    setVersion(etag);
+  }, [etag]);
+
   useEffect(() => {
     if (pass && pass === ADMIN_PASSWORD) {
       setAuthed(true);
@@ -47,25 +52,30 @@ export default function Admin() {
       return;
     }
     try {
-      const payload = {
-        ...data,
+      // Merge patch of just the edited fields; If-Match rejects the save if someone else changed the content first
+      const patch = {
         hero: {
-          ...data.hero,
           ctas: {
-            ...data.hero.ctas,
             dexUrl: form.dexUrl,
             telegram: form.telegram,
             twitter: form.twitter,
           },
         },
         config: {
-          ...data.config,
           contractAddress: form.contractAddress,
         },
       };
-      await axios.put(`${API}/content`, payload, { timeout: 20000 });
+      const res = await axios.patch(`${API}/content`, patch, {
+        timeout: 20000,
+        headers: { "Content-Type": "application/merge-patch+json", ...(version ? { "If-Match": version } : {}) },
+      });
+      setVersion(res.headers?.etag || null);
       toast({ title: "Saved", description: "Content updated successfully", duration: 2500 });
     } catch (e) {
+      if (e?.response?.status === 412) {
+        toast({ title: "Save failed", description: "Content was changed by someone else. Reload and try again.", duration: 4000 });
+        return;
+      }
       toast({ title: "Save failed", description: e?.message || "Unknown error", duration: 3000 });
     }
   };
@@ -0,0 +1,36 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# mongomock has no change streams; poll instead of retrying the watch
+os.environ.setdefault("CONTENT_SYNC_MODE", "poll")
+# Every TestClient request shares one client address; tests opt into limits explicitly
+os.environ.setdefault("RATE_LIMITS", "")
+
+
+@pytest.fixture
+def server():
+    import server as server_module
+
+    # Module-level caches outlive each app instance; start every test from scratch
+    server_module.content_cache.invalidate()
+    server_module.content_cache.version = -1
+    server_module.stats_cache.entries.clear()
+    server_module.bucket_cache.entries.clear()
+    return server_module
+
+
+@pytest.fixture
+def client(server, monkeypatch):
+    from fastapi.testclient import TestClient
+    from mongomock_motor import AsyncMongoMockClient
+
+    mongo = AsyncMongoMockClient()
+    monkeypatch.setattr(server, "create_mongo_client", lambda: mongo)
+    with TestClient(server.app) as test_client:
+        yield test_client
@@ -0,0 +1,52 @@
+def put_content(client, title):
+    content = client.get("/api/content").json()
+    content["hero"]["title"] = title
+    assert client.put("/api/content", json=content).status_code == 200
+
+
+def test_content_is_reseeded_after_delete(client, server):
+    for title in ("a", "b", "c"):
+        put_content(client, title)
+    assert client.get("/api/content").headers["etag"].startswith('"3-')
+
+    async def delete():
+        await server.db.site_content.delete_one({"_id": "kog_site"})
+        server.content_cache.invalidate()  # what the change stream does on delete
+
+    client.portal.call(delete)
+    response = client.get("/api/content")
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"0-')
+    assert response.json()["hero"]["title"] == server.DEFAULT_CONTENT.hero.title
+
+
+def test_poll_picks_up_a_reset_database_with_lower_versions(client, server):
+    for title in ("a", "b", "c"):
+        put_content(client, title)
+
+    async def reset():
+        await server.db.site_content.delete_one({"_id": "kog_site"})
+        await server.refresh_content_if_stale()  # sees the delete
+        await server.seed_content()
+        await server.refresh_content_if_stale()  # sees the new document
+
+    client.portal.call(reset)
+    assert server.content_cache.version == 0
+    response = client.get("/api/content")
+    assert response.headers["etag"].startswith('"0-')
+    assert response.json()["hero"]["title"] == server.DEFAULT_CONTENT.hero.title
+
+
+def test_poll_replaces_content_from_another_epoch_without_a_delete(client, server):
+    for title in ("a", "b"):
+        put_content(client, title)
+
+    async def swap():
+        doc = {**server.DEFAULT_CONTENT.model_dump(), "_id": "kog_site", "version": 1, "epoch": "other"}
+        doc["hero"]["title"] = "other database"
+        await server.db.site_content.replace_one({"_id": "kog_site"}, doc)
+        await server.refresh_content_if_stale()
+
+    client.portal.call(swap)
+    assert client.get("/api/content").json()["hero"]["title"] == "other database"
+    assert server.content_epoch == "other"
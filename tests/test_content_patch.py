@@ -0,0 +1,121 @@
+import copy
+
+import pytest
+from fastapi import HTTPException
+
+MERGE_PATCH = {"Content-Type": "application/merge-patch+json"}
+JSON_PATCH = {"Content-Type": "application/json-patch+json"}
+
+
+@pytest.fixture
+def doc(server):
+    return server.DEFAULT_CONTENT.model_dump()
+
+
+# ===== Pointer resolution =====
+def test_resolve_pointer_returns_parent_key_and_path(server, doc):
+    parent, key, path = server.resolve_pointer(doc, server.parse_json_pointer("/faqs/1/q"))
+    assert parent is doc["faqs"][1]
+    assert key == "q"
+    assert path == ("faqs", 1)
+
+
+def test_resolve_pointer_unescapes_tokens(server):
+    assert server.parse_json_pointer("/a~1b/c~0d") == ["a/b", "c~d"]
+
+
+@pytest.mark.parametrize("pointer", ["/nope", "/hero/nope", "/faqs/x", "/faqs/99/q"])
+def test_resolve_pointer_rejects_unknown_paths(server, doc, pointer):
+    with pytest.raises(HTTPException) as exc:
+        server.resolve_pointer(doc, server.parse_json_pointer(pointer))
+    assert exc.value.status_code == 422
+
+
+def test_resolve_pointer_allows_end_of_array_only_for_insert(server, doc):
+    end = f"/faqs/{len(doc['faqs'])}"
+    with pytest.raises(HTTPException):
+        server.resolve_pointer(doc, server.parse_json_pointer(end))
+    _, key, _ = server.resolve_pointer(doc, server.parse_json_pointer(end), insert=True)
+    assert key == len(doc["faqs"])
+
+
+# ===== Update folding =====
+def test_build_content_update_sets_leaf_paths(server, doc):
+    new = copy.deepcopy(doc)
+    new["hero"]["title"] = "New"
+    update = server.build_content_update([("set", ("hero", "title"))], new, doc)
+    assert update == {"$set": {"hero.title": "New"}}
+
+
+def test_build_content_update_pushes_appended_items(server, doc):
+    new = copy.deepcopy(doc)
+    item = {"q": "Q", "a": "A"}
+    new["faqs"].append(item)
+    update = server.build_content_update([("push", ("faqs",))], new, doc)
+    assert update == {"$push": {"faqs": {"$each": [item]}}}
+
+
+def test_build_content_update_folds_push_into_set_on_same_array(server, doc):
+    new = copy.deepcopy(doc)
+    new["faqs"][0]["q"] = "Changed"
+    new["faqs"].append({"q": "Q", "a": "A"})
+    update = server.build_content_update([("set", ("faqs", 0, "q")), ("push", ("faqs",))], new, doc)
+    assert update == {"$set": {"faqs": new["faqs"]}}
+
+
+def test_build_content_update_drops_paths_under_a_set_ancestor(server, doc):
+    new = copy.deepcopy(doc)
+    new["hero"]["title"] = "New"
+    update = server.build_content_update([("set", ("hero", "title")), ("set", ("hero",))], new, doc)
+    assert update == {"$set": {"hero": new["hero"]}}
+
+
+# ===== PATCH /api/content =====
+def test_patch_without_precondition_is_428(client):
+    response = client.patch("/api/content", json={"hero": {"title": "X"}}, headers=MERGE_PATCH)
+    assert response.status_code == 428
+
+
+def test_patch_with_stale_etag_is_412(client):
+    etag = client.get("/api/content").headers["etag"]
+    assert client.patch("/api/content", json={"hero": {"title": "A"}}, headers={**MERGE_PATCH, "If-Match": etag}).status_code == 200
+    response = client.patch("/api/content", json={"hero": {"title": "B"}}, headers={**MERGE_PATCH, "If-Match": etag})
+    assert response.status_code == 412
+
+
+def test_patch_with_unparseable_etag_is_412(client):
+    response = client.patch("/api/content", json={"hero": {"title": "X"}}, headers={**MERGE_PATCH, "If-Match": '"abc"'})
+    assert response.status_code == 412
+
+
+def test_merge_patch_null_resets_field_to_default(client):
+    etag = client.get("/api/content").headers["etag"]
+    client.patch("/api/content", json={"config": {"contractAddress": "0xabc"}}, headers={**MERGE_PATCH, "If-Match": etag})
+    response = client.patch("/api/content?version=1", json={"config": {"contractAddress": None}}, headers=MERGE_PATCH)
+    assert response.status_code == 200
+    assert response.json()["config"]["contractAddress"] == ""
+
+
+def test_merge_patch_null_on_required_field_is_422(client):
+    response = client.patch("/api/content?version=0", json={"hero": {"title": None}}, headers=MERGE_PATCH)
+    assert response.status_code == 422
+
+
+def test_json_patch_cannot_remove_a_section(client):
+    response = client.patch("/api/content?version=0", json=[{"op": "remove", "path": "/hero"}], headers=JSON_PATCH)
+    assert response.status_code == 422
+
+
+def test_json_patch_test_past_end_of_array_is_422(client):
+    faqs = client.get("/api/content").json()["faqs"]
+    operation = {"op": "test", "path": f"/faqs/{len(faqs)}", "value": {"q": "", "a": ""}}
+    response = client.patch("/api/content?version=0", json=[operation], headers=JSON_PATCH)
+    assert response.status_code == 422
+
+
+def test_json_patch_add_at_end_of_array_appends(client):
+    faqs = client.get("/api/content").json()["faqs"]
+    operation = {"op": "add", "path": f"/faqs/{len(faqs)}", "value": {"q": "Q", "a": "A"}}
+    response = client.patch("/api/content?version=0", json=[operation], headers=JSON_PATCH)
+    assert response.status_code == 200
+    assert response.json()["faqs"][-1] == {"q": "Q", "a": "A"}
@@ -0,0 +1,73 @@
+import asyncio
+
+from events import Broadcaster, format_event
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_format_event_splits_multiline_data():
+    assert format_event("content", "a\nb", event_id="3") == b"id: 3\nevent: content\ndata: a\ndata: b\n\n"
+
+
+def test_subscription_is_taken_on_first_iteration_and_released():
+    async def scenario():
+        broadcaster = Broadcaster()
+        stream = broadcaster.stream(heartbeat=1, max_lifetime=1, opening=lambda: b"id: 1\n\n")
+        assert not broadcaster.subscribers
+        first = await stream.__anext__()
+        assert len(broadcaster.subscribers) == 1
+        await stream.aclose()
+        return first, broadcaster.subscribers
+
+    first, subscribers = run(scenario())
+    assert first == b"retry: 3000\n\nid: 1\n\n"
+    assert not subscribers
+
+
+def test_published_messages_reach_the_stream():
+    async def scenario():
+        broadcaster = Broadcaster()
+        stream = broadcaster.stream(heartbeat=1, max_lifetime=5)
+        await stream.__anext__()
+        broadcaster.publish(b"event")
+        message = await stream.__anext__()
+        await stream.aclose()
+        return message
+
+    assert run(scenario()) == b"event"
+
+
+def test_stream_sends_heartbeats_and_ends_after_max_lifetime():
+    async def scenario():
+        broadcaster = Broadcaster()
+        chunks = [chunk async for chunk in broadcaster.stream(heartbeat=0.02, max_lifetime=0.1)]
+        return chunks, broadcaster.subscribers
+
+    chunks, subscribers = run(scenario())
+    assert b": ping\n\n" in chunks
+    assert not subscribers
+
+
+def test_slow_consumer_is_evicted_and_its_stream_ends():
+    async def scenario():
+        broadcaster = Broadcaster(max_queue=2)
+        stream = broadcaster.stream(heartbeat=1, max_lifetime=5)
+        await stream.__anext__()
+        for _ in range(3):
+            broadcaster.publish(b"x")
+        rest = [chunk async for chunk in stream]
+        return rest, broadcaster
+
+    rest, broadcaster = run(scenario())
+    assert rest == []
+    assert broadcaster.evictions == 1
+    assert not broadcaster.subscribers
+
+
+def test_full_broadcaster_refuses_new_subscribers():
+    broadcaster = Broadcaster(max_subscribers=1)
+    assert broadcaster.subscribe() is not None
+    assert broadcaster.full()
+    assert broadcaster.subscribe() is None
@@ -0,0 +1,147 @@
+import asyncio
+import json
+
+import pytest
+
+import ratelimit
+from ratelimit import ConcurrencyLimiter, LoadSheddingMiddleware, TokenBucketLimiter, parse_rate_limits
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_parse_rate_limits():
+    assert parse_rate_limits("post /api/status=20:40, POST /api/x*=2") == [
+        ("POST", "/api/status", 20.0, 40.0),
+        ("POST", "/api/x*", 2.0, 2.0),
+    ]
+
+
+def test_bucket_allows_burst_then_refills(clock):
+    limiter = TokenBucketLimiter(parse_rate_limits("POST /a=2:3"))
+    assert [limiter.take(0, "c") for _ in range(3)] == [0, 0, 0]
+    assert limiter.take(0, "c") == pytest.approx(0.5)
+    clock[0] += 0.5
+    assert limiter.take(0, "c") == 0
+    assert limiter.take(0, "c") > 0
+    assert limiter.take(0, "other") == 0
+
+
+def test_bucket_table_stays_bounded_when_nothing_has_refilled(clock):
+    limiter = TokenBucketLimiter(parse_rate_limits("POST /a=1:2"), max_buckets=10)
+    for client in range(100):
+        limiter.take(0, str(client))
+        limiter.take(0, str(client))
+    assert len(limiter.buckets) <= 10
+
+
+# ===== Middleware =====
+async def call(middleware, method="POST", path="/a", headers=(), client=("10.0.0.1", 1234)):
+    scope = {"type": "http", "method": method, "path": path, "headers": list(headers), "client": client}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    start = messages[0]
+    return start["status"], dict(start.get("headers", [])), messages
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def make_middleware(app=ok_app, spec="POST /a=1:1", read=(4, 0.0), write=(4, 0.0), **kwargs):
+    return LoadSheddingMiddleware(
+        app,
+        rate_limiter=TokenBucketLimiter(parse_rate_limits(spec)),
+        read_limiter=ConcurrencyLimiter(*read),
+        write_limiter=ConcurrencyLimiter(*write),
+        **kwargs,
+    )
+
+
+def test_rate_limited_request_gets_429_with_retry_after(clock):
+    middleware = make_middleware(spec="POST /a=0.5:1")
+
+    async def scenario():
+        first = await call(middleware)
+        second = await call(middleware)
+        return first, second
+
+    (first_status, _, _), (status, headers, messages) = asyncio.run(scenario())
+    assert first_status == 200
+    assert status == 429
+    assert headers[b"retry-after"] == b"2"
+    assert json.loads(messages[1]["body"]) == {"detail": "Rate limit exceeded"}
+
+
+def test_forwarded_for_uses_the_entry_appended_by_the_trusted_proxy(clock):
+    middleware = make_middleware(trusted_proxies=1)
+
+    async def scenario():
+        statuses = []
+        for fake in range(5):
+            headers = [(b"x-forwarded-for", f"1.2.3.{fake}, 203.0.113.7".encode())]
+            statuses.append((await call(middleware, headers=headers))[0])
+        other = [(b"x-forwarded-for", b"198.51.100.2")]
+        statuses.append((await call(middleware, headers=other))[0])
+        return statuses
+
+    assert asyncio.run(scenario()) == [200, 429, 429, 429, 429, 200]
+
+
+def test_forwarded_for_is_ignored_without_trusted_proxies(clock):
+    middleware = make_middleware()
+
+    async def scenario():
+        first = await call(middleware, headers=[(b"x-forwarded-for", b"1.1.1.1")])
+        second = await call(middleware, headers=[(b"x-forwarded-for", b"2.2.2.2")])
+        return first[0], second[0]
+
+    assert asyncio.run(scenario()) == (200, 429)
+
+
+def test_writes_are_shed_while_reads_are_queued():
+    release = None
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await ok_app(scope, receive, send)
+
+    middleware = make_middleware(app=slow_app, spec="", read=(1, 5.0), write=(4, 0.0))
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        holding = asyncio.create_task(call(middleware, method="GET"))
+        queued = asyncio.create_task(call(middleware, method="GET"))
+        await asyncio.sleep(0.01)
+        assert middleware.read_limiter.waiting == 1
+        write_status, write_headers, _ = await call(middleware, method="POST")
+        release.set()
+        reads = [(await holding)[0], (await queued)[0]]
+        return write_status, write_headers, reads
+
+    write_status, write_headers, reads = asyncio.run(scenario())
+    assert write_status == 503
+    assert write_headers[b"retry-after"] == b"1"
+    assert reads == [200, 200]
+
+
+def test_exempt_paths_bypass_limits(clock):
+    middleware = make_middleware(spec="GET /metrics=0.1:1", read=(1, 0.0), exempt_paths=("/metrics",))
+
+    async def scenario():
+        return [(await call(middleware, method="GET", path="/metrics"))[0] for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [200, 200, 200]
@@ -0,0 +1,198 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import retention
+from retention import DAILY, HOURLY, TTL_INDEX_NAME, StatusRetention
+
+NOW = datetime(2026, 3, 10, 15, 20)
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, *args):
+        return self
+
+    async def to_list(self, length):
+        return self.docs
+
+
+class FakeCollection:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    def aggregate(self, pipeline):
+        self.db.calls.append(("aggregate", self.name, pipeline))
+        if self.db.fail_aggregate:
+            raise RuntimeError("aggregation failed")
+        return FakeCursor([])
+
+    def find(self, *args):
+        return FakeCursor([{"timestamp": self.db.oldest}] if self.db.oldest else [])
+
+    async def find_one(self, query):
+        return self.db.state
+
+    async def update_one(self, query, update, upsert=False):
+        self.db.state = {"_id": "status_checks", **update["$set"]}
+
+    async def create_index(self, keys, **kwargs):
+        self.db.calls.append(("create_index", self.name, kwargs))
+
+
+class FakeDB:
+    """Records the aggregations run_once issues; mongomock has neither $merge nor $dateTrunc."""
+
+    def __init__(self, oldest=None, state=None):
+        self.oldest = oldest
+        self.state = state
+        self.fail_aggregate = False
+        self.calls = []
+
+    def __getitem__(self, name):
+        return FakeCollection(self, name)
+
+    def __getattr__(self, name):
+        return FakeCollection(self, name)
+
+    def windows(self):
+        """(collection, $match range) of every aggregation, in order."""
+        result = []
+        for kind, name, pipeline in self.calls:
+            if kind == "aggregate":
+                (field, bounds), = pipeline[0]["$match"].items()
+                result.append((name, bounds["$gte"], bounds["$lt"], pipeline[-1]["$merge"]["into"]))
+        return result
+
+
+@pytest.fixture(autouse=True)
+def frozen_now(monkeypatch):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return NOW
+
+    monkeypatch.setattr(retention, "datetime", FrozenDatetime)
+
+
+def run_once(db, **kwargs):
+    return asyncio.run(StatusRetention(db, **kwargs).run_once())
+
+
+def test_nothing_to_do_without_rows():
+    db = FakeDB()
+    assert run_once(db, retention_days=7) == 0
+    assert db.calls == []
+
+
+def test_first_run_starts_at_the_oldest_row_hour_and_stops_at_the_cutoff():
+    db = FakeDB(oldest=datetime(2026, 3, 1, 22, 45))
+    hours = run_once(db, retention_days=7, lead_hours=24)
+    # cutoff = hour(now - 7d + 24h) = 2026-03-04 15:00
+    cutoff = datetime(2026, 3, 4, 15)
+    assert db.state["rolled_up_to"] == cutoff
+    assert hours == (cutoff - datetime(2026, 3, 1, 22)).total_seconds() // 3600
+    raw = [w for w in db.windows() if w[0] == "status_checks"]
+    assert raw[0][1] == datetime(2026, 3, 1, 22)
+    assert raw[-1][2] == cutoff
+    # Windows tile the range without gaps or overlap
+    assert all(a[2] == b[1] for a, b in zip(raw, raw[1:]))
+
+
+def test_each_chunk_recomputes_every_day_it_touches():
+    db = FakeDB(oldest=datetime(2026, 3, 2, 18, 5))
+    run_once(db, retention_days=7, lead_hours=24)
+    windows = db.windows()
+    assert windows[0] == ("status_checks", datetime(2026, 3, 2, 18), datetime(2026, 3, 3, 18), HOURLY)
+    # The first chunk spans 2 and 3 March, so both days are rebuilt from the hourly rollups
+    assert windows[1] == (HOURLY, datetime(2026, 3, 2), datetime(2026, 3, 4), DAILY)
+
+
+def test_merges_replace_whole_buckets():
+    db = FakeDB(oldest=datetime(2026, 3, 3, 10))
+    run_once(db, retention_days=7)
+    merges = [pipeline[-1]["$merge"] for kind, _, pipeline in db.calls if kind == "aggregate"]
+    assert merges and all(merge["whenMatched"] == "replace" and merge["on"] == "_id" for merge in merges)
+
+
+def test_rerun_after_catching_up_does_nothing():
+    db = FakeDB(oldest=datetime(2026, 3, 3, 10))
+    run_once(db, retention_days=7)
+    db.calls.clear()
+    assert run_once(db, retention_days=7) == 0
+    assert db.calls == []
+
+
+def test_rerun_from_an_unsaved_watermark_recomputes_the_same_windows():
+    # A crash after the $merge but before the watermark update repeats that window exactly
+    first = FakeDB(oldest=datetime(2026, 3, 3, 10))
+    run_once(first, retention_days=7)
+    second = FakeDB(oldest=datetime(2026, 3, 3, 10))
+    run_once(second, retention_days=7)
+    assert first.windows() == second.windows()
+
+
+def test_cutoff_never_passes_the_open_hour_when_lead_exceeds_retention():
+    db = FakeDB(oldest=datetime(2026, 3, 10, 9, 30))
+    run_once(db, retention_days=1 / 24, lead_hours=48)
+    assert db.state["rolled_up_to"] == datetime(2026, 3, 10, 15)
+
+
+def test_watermark_comes_from_state_when_present():
+    db = FakeDB(oldest=datetime(2026, 1, 1), state={"_id": "status_checks", "rolled_up_to": datetime(2026, 3, 4, 12)})
+    assert run_once(db, retention_days=7) == 3
+    assert db.windows()[0][1] == datetime(2026, 3, 4, 12)
+
+
+def test_lead_is_at_least_one_hour():
+    assert StatusRetention(FakeDB(), 7, lead_hours=0).lead == timedelta(hours=1)
+
+
+# ===== TTL ordering =====
+def run_forever_once(db):
+    async def scenario():
+        task = asyncio.create_task(StatusRetention(db, 7, interval=3600).run_forever())
+        await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(scenario())
+    return [call for call in db.calls if call[0] == "create_index"]
+
+
+def test_ttl_index_is_created_after_the_backfill():
+    db = FakeDB(oldest=datetime(2026, 3, 1))
+    run_forever_once(db)
+    kinds = [(call[0], call[1]) for call in db.calls]
+    assert kinds[-1] == ("create_index", "status_checks")
+    assert db.calls[-1][2] == {"name": TTL_INDEX_NAME, "expireAfterSeconds": 7 * 86400}
+    assert ("aggregate", "status_checks") in kinds
+
+
+def test_ttl_index_is_not_created_when_the_backfill_fails():
+    db = FakeDB(oldest=datetime(2026, 3, 1))
+    db.fail_aggregate = True
+    assert run_forever_once(db) == []
+
+
+def test_drop_ttl_index_ignores_a_missing_index():
+    from pymongo.errors import OperationFailure
+
+    dropped = []
+
+    class Collection:
+        async def drop_index(self, name):
+            dropped.append(name)
+            raise OperationFailure("index not found", code=27)
+
+    class DB:
+        status_checks = Collection()
+
+    asyncio.run(retention.drop_ttl_index(DB()))
+    assert dropped == [TTL_INDEX_NAME]
@@ -0,0 +1,52 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from snapshot import inline_into_html, write_snapshot
+
+
+def read_meta(directory):
+    return json.loads((directory / "content-meta.json").read_text())
+
+
+def test_write_snapshot_publishes_version(tmp_path):
+    assert write_snapshot(tmp_path, b'{"v":1}', 1, '"1-a"', epoch="e1")
+    assert (tmp_path / "content.json").read_bytes() == b'{"v":1}'
+    assert (tmp_path / "content.v1.json").read_bytes() == b'{"v":1}'
+    assert read_meta(tmp_path) == {"version": 1, "etag": '"1-a"', "file": "content.v1.json", "epoch": "e1"}
+
+
+def test_older_version_is_skipped_and_logged(tmp_path, caplog):
+    write_snapshot(tmp_path, b"new", 5, '"5"', epoch="e1")
+    with caplog.at_level(logging.INFO, logger="snapshot"):
+        assert not write_snapshot(tmp_path, b"old", 4, '"4"', epoch="e1")
+    assert (tmp_path / "content.json").read_bytes() == b"new"
+    assert "skipped version 4" in caplog.text
+
+
+def test_new_epoch_replaces_higher_versions(tmp_path):
+    for version in (40, 41, 42):
+        write_snapshot(tmp_path, b"old", version, f'"{version}"', epoch="before-reset")
+    assert write_snapshot(tmp_path, b"fresh", 0, '"0"', epoch="after-reset")
+    assert (tmp_path / "content.json").read_bytes() == b"fresh"
+    assert read_meta(tmp_path)["version"] == 0
+    assert sorted(p.name for p in tmp_path.glob("content.v*.json")) == ["content.v0.json"]
+
+
+def test_only_recent_versions_are_kept(tmp_path):
+    for version in range(8):
+        write_snapshot(tmp_path, b"x", version, f'"{version}"', keep=3, epoch="e")
+    assert sorted(p.name for p in tmp_path.glob("content.v*.json")) == [f"content.v{v}.json" for v in (5, 6, 7)]
+
+
+def test_concurrent_writers_leave_the_newest_version(tmp_path):
+    versions = list(range(50))
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda v: write_snapshot(tmp_path, str(v).encode(), v, f'"{v}"', epoch="e"), reversed(versions)))
+    assert read_meta(tmp_path)["version"] == 49
+    assert (tmp_path / "content.json").read_bytes() == b"49"
+
+
+def test_inline_into_html_escapes_script_end():
+    html = inline_into_html("<html><head></head></html>", b'{"a":"</script>"}')
+    assert '<script id="kog-content" type="application/json">{"a":"<\\/script>"}</script></head>' in html
@@ -0,0 +1,41 @@
+import json
+
+
+def test_bulk_inserts_valid_items_and_reports_invalid_ones(client):
+    body = [{"client_name": "a"}, {"nope": 1}, {"client_name": "b"}]
+    response = client.post("/api/status/bulk", json=body)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["inserted"] == 2
+    assert [error["index"] for error in result["errors"]] == [1]
+
+
+def test_bulk_accepts_ndjson(client):
+    body = b'{"client_name": "a"}\n\nnot json\n{"client_name": "b"}\n'
+    response = client.post("/api/status/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.json()["inserted"] == 2
+    assert [error["index"] for error in response.json()["errors"]] == [2]
+
+
+def test_bulk_rejects_oversized_content_length_before_reading(client, server, monkeypatch):
+    monkeypatch.setattr(server, "STATUS_BULK_MAX_BYTES", 64)
+    body = json.dumps([{"client_name": "x" * 10}] * 10)
+    response = client.post("/api/status/bulk", content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 413
+
+
+def test_bulk_rejects_oversized_chunked_body(client, server, monkeypatch):
+    monkeypatch.setattr(server, "STATUS_BULK_MAX_BYTES", 64)
+
+    def chunks():
+        for _ in range(10):
+            yield b'{"client_name": "xxxxxxxxxx"}\n'
+
+    response = client.post("/api/status/bulk", content=chunks(), headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 413
+
+
+def test_bulk_rejects_too_many_items(client, server, monkeypatch):
+    monkeypatch.setattr(server, "STATUS_BULK_MAX_ITEMS", 2)
+    response = client.post("/api/status/bulk", json=[{"client_name": "a"}] * 3)
+    assert response.status_code == 413
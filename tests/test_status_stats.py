@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def timeline(server, monkeypatch):
+    """Drive get_status_timeline with a fixed clock and a recording aggregation."""
+    state = {"now": datetime(2026, 1, 1, 12, 0, 40), "calls": [], "rows": {}}
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return state["now"]
+
+    async def aggregate(unit, since, until, client_name):
+        state["calls"].append((since, until))
+        return [
+            {"bucket": bucket, "count": count}
+            for bucket, count in sorted(state["rows"].items())
+            if bucket >= since and (until is None or bucket < until)
+        ]
+
+    monkeypatch.setattr(server, "datetime", FrozenDatetime)
+    monkeypatch.setattr(server, "aggregate_status_buckets", aggregate)
+    monkeypatch.setattr(server, "STATUS_STATS_CLOSED_GRACE", 30.0)
+    return state
+
+
+def run(server, *args):
+    import asyncio
+
+    return asyncio.run(server.get_status_timeline(*args))
+
+
+def test_closed_buckets_are_cached_individually(server, timeline):
+    since = datetime(2026, 1, 1, 11, 55)
+    timeline["rows"] = {since + timedelta(minutes=i): i + 1 for i in range(6)}
+    rows = run(server, "minute", since, None, None)
+    assert [row["count"] for row in rows] == [1, 2, 3, 4, 5, 6]
+    # 11:55-11:59 are closed (one query), 12:00 is still open
+    assert timeline["calls"] == [(since, datetime(2026, 1, 1, 12, 0)), (datetime(2026, 1, 1, 12, 0), None)]
+
+    timeline["calls"].clear()
+    timeline["now"] = datetime(2026, 1, 1, 12, 1, 40)
+    run(server, "minute", since, None, None)
+    # Only the bucket that just closed is aggregated again, plus the open one
+    assert timeline["calls"] == [
+        (datetime(2026, 1, 1, 12, 0), datetime(2026, 1, 1, 12, 1)),
+        (datetime(2026, 1, 1, 12, 1), None),
+    ]
+
+
+def test_bucket_stays_open_during_grace_period(server, timeline):
+    timeline["now"] = datetime(2026, 1, 1, 12, 0, 10)
+    since = datetime(2026, 1, 1, 11, 58)
+    run(server, "minute", since, None, None)
+    # 11:59 ended 10s ago, inside the 30s grace, so it is queried with the open range
+    assert timeline["calls"] == [
+        (since, datetime(2026, 1, 1, 11, 59)),
+        (datetime(2026, 1, 1, 11, 59), None),
+    ]
+
+
+def test_empty_closed_buckets_are_cached_but_not_returned(server, timeline):
+    since = datetime(2026, 1, 1, 11, 50)
+    timeline["rows"] = {datetime(2026, 1, 1, 11, 52): 4}
+    until = datetime(2026, 1, 1, 11, 55)
+    assert run(server, "minute", since, until, None) == [{"bucket": datetime(2026, 1, 1, 11, 52), "count": 4}]
+    timeline["calls"].clear()
+    assert run(server, "minute", since, until, None) == [{"bucket": datetime(2026, 1, 1, 11, 52), "count": 4}]
+    assert timeline["calls"] == []
+
+
+def test_far_past_since_is_rejected_without_building_buckets(server, timeline):
+    from fastapi import HTTPException
+
+    with pytest.raises(HTTPException) as exc:
+        run(server, "minute", datetime(1, 1, 1), None, None)
+    assert exc.value.status_code == 422
+    assert timeline["calls"] == []
+
+
+def test_wide_range_within_limit_is_aggregated_once_without_per_bucket_caching(server, timeline, monkeypatch):
+    monkeypatch.setattr(server, "bucket_cache", server.StatsCache(max_entries=10))
+    since = datetime(2026, 1, 1, 10, 0)
+    run(server, "minute", since, None, None)
+    assert timeline["calls"][0] == (since, datetime(2026, 1, 1, 12, 0))
+    assert not server.bucket_cache.entries